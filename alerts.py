@@ -0,0 +1,182 @@
+import argparse
+import json
+import operator
+import platform
+import shutil
+import subprocess
+import threading
+import time
+import pandas as pd
+import requests
+from signal_engine import entry_exit
+from stream_ingest import ReplaySource, StreamIngestor
+from streaming_indicators import SignalBook
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+
+
+class Rule:
+    # Fires when `when(ctx)` turns true for a symbol; symbols=None subscribes to every symbol
+    def __init__(self, name, when, tf="1m", symbols=None, message=None, cooldown=0):
+        self.name = name
+        self.when = when
+        self.tf = tf
+        self.symbols = set(symbols) if symbols else None
+        self.message = message or name
+        self.cooldown = cooldown
+
+
+def threshold_rule(spec):
+    # {"name": ..., "tf": "5m", "field": "rsi", "op": "<", "value": 30, "symbols": [...]}
+    conditions = spec.get("all") or [spec]
+    checks = [(c["field"], OPERATORS[c["op"]], c["value"]) for c in conditions]
+
+    def when(ctx):
+        return all(ctx.get(field) is not None and op(ctx[field], value) for field, op, value in checks)
+
+    return Rule(spec["name"], when, spec.get("tf", "1m"), spec.get("symbols"), spec.get("message"), spec.get("cooldown", 0))
+
+
+def default_rules():
+    return [
+        Rule("entry", lambda ctx: ctx["setup"] == "entry", "1m", message="Strong BUY entry confirmed ✅"),
+        Rule("exit", lambda ctx: ctx["setup"] == "exit", "1m", message="Possible EXIT signal ⚠️"),
+    ]
+
+
+def load_rules(path):
+    with open(path) as f:
+        return [threshold_rule(spec) for spec in json.load(f)]
+
+
+class LogSink:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def send(self, alert):
+        with self.lock, open(self.path, "a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    def __init__(self, url, timeout=2):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alert):
+        try:
+            self.session.post(self.url, json=alert, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Webhook failed: {e}")
+
+
+class DesktopSink:
+    def __init__(self):
+        self.system = platform.system()
+
+    def send(self, alert):
+        title, body = f"{alert['symbol']} {alert['rule']}", alert["message"]
+        if self.system == "Darwin":
+            cmd = ["osascript", "-e", f"display notification {json.dumps(body)} with title {json.dumps(title)}"]
+        elif shutil.which("notify-send"):
+            cmd = ["notify-send", title, body]
+        else:
+            return
+        subprocess.run(cmd, check=False, timeout=5)
+
+
+class PrintSink:
+    def send(self, alert):
+        print(f"🔔 {alert['time']} {alert['symbol']} [{alert['tf']}] {alert['message']}")
+
+
+class AlertEngine:
+    def __init__(self, rules=None, sinks=None, book=None):
+        self.book = book or SignalBook()
+        self.sinks = sinks or [PrintSink()]
+        self.active = {}
+        self.last_fired = {}
+        # (symbol, tf) -> rules for that symbol, ("*", tf) -> rules for every symbol
+        self.index = {}
+        for rule in rules if rules is not None else default_rules():
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        for symbol in rule.symbols or ["*"]:
+            self.index.setdefault((symbol, rule.tf), []).append(rule)
+
+    def context(self, symbol, tf, ts):
+        state = self.book.get(symbol, tf)
+        if state is None or not state.ready:
+            return None
+        return {
+            "symbol": symbol, "tf": tf, "ts": ts,
+            "rsi": state.rsi, "macd": state.macd, "signal": state.signal, "rvol": state.rvol,
+            "score": state.score, "setup": entry_exit(state.rsi, state.macd, state.signal, state.rvol),
+        }
+
+    def evaluate(self, symbol, tf, ts=None):
+        rules = self.index.get((symbol, tf), []) + self.index.get(("*", tf), [])
+        if not rules:
+            return []
+        ctx = self.context(symbol, tf, ts)
+        if ctx is None:
+            return []
+        fired = []
+        for rule in rules:
+            key = (rule.name, symbol)
+            hit = bool(rule.when(ctx))
+            was_active = self.active.get(key, False)
+            self.active[key] = hit
+            # Edge-triggered: a rule that stays true across bars alerts once
+            if not hit or was_active:
+                continue
+            now = time.time()
+            if now - self.last_fired.get(key, 0) < rule.cooldown:
+                continue
+            self.last_fired[key] = now
+            alert = {
+                "rule": rule.name, "symbol": symbol, "tf": tf, "message": rule.message,
+                "time": pd.Timestamp(ts).isoformat() if ts is not None else pd.Timestamp.now(tz="UTC").isoformat(),
+                "rsi": ctx["rsi"], "macd": ctx["macd"], "signal": ctx["signal"], "rvol": ctx["rvol"],
+            }
+            for sink in self.sinks:
+                sink.send(alert)
+            fired.append(alert)
+        return fired
+
+    def on_bar(self, symbol, tf, ts, bar):
+        ts = pd.Timestamp(ts, tz="UTC")
+        self.book.update(symbol, tf, ts, bar[3], bar[4])
+        return self.evaluate(symbol, tf, ts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate entry/exit and custom alert rules on streamed bars")
+    parser.add_argument("--replay", required=True, help="tick CSV (timestamp,symbol,price,size)")
+    parser.add_argument("--replay-speed", type=float)
+    parser.add_argument("--rules", help="JSON list of threshold rules added to the entry/exit rules")
+    parser.add_argument("--log", help="append alerts as JSON lines to this file")
+    parser.add_argument("--webhook", help="POST each alert as JSON to this URL")
+    parser.add_argument("--desktop", action="store_true", help="show desktop notifications")
+    args = parser.parse_args()
+
+    rules = default_rules() + (load_rules(args.rules) if args.rules else [])
+    sinks = [PrintSink()]
+    if args.log:
+        sinks.append(LogSink(args.log))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    if args.desktop:
+        sinks.append(DesktopSink())
+
+    engine = AlertEngine(rules, sinks)
+    started = time.perf_counter()
+    StreamIngestor(engine.on_bar).run(ReplaySource(args.replay, args.replay_speed))
+    print(f"\n⏱️ Replay finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import metrics
+from bar_store import get_store
+from indicators import macd, rsi, rvol
+from market_data import fetch_frames
+from resampler import rule_for
+from scheduler import INTERVAL_SECONDS
+from signal_engine import FRAMES
+
+BASE_FRAME = "1m"
+MARKET_TZ = "America/New_York"
+SESSION_CLOSE = pd.Timedelta(hours=16)
+
+
+def bar_duration(tf, params):
+    rule = rule_for(tf, params)
+    if rule:
+        return pd.Timedelta(rule[0])
+    if tf.endswith("m") and tf[:-1].isdigit():
+        return pd.Timedelta(minutes=int(tf[:-1]))
+    return pd.Timedelta(seconds=INTERVAL_SECONDS[params["interval"]])
+
+
+@metrics.timed("indicators")
+def frame_indicators(df):
+    close = df[["Close"]]
+    out = pd.DataFrame(index=df.index)
+    out["RSI"] = rsi(close)["Close"]
+    line, signal, _ = macd(close)
+    out["MACD"] = line["Close"]
+    out["Signal"] = signal["Close"]
+    out["RVOL"] = rvol(df[["Volume"]])["Volume"]
+    return out
+
+
+def frame_score(ind, rsi_low=30, rsi_high=70):
+    score = (ind["RSI"] < rsi_low).astype(float) - (ind["RSI"] > rsi_high).astype(float)
+    score += np.sign(ind["MACD"] - ind["Signal"])
+    valid = ind[["RSI", "MACD", "Signal"]].notna().all(axis=1)
+    return score.where(valid)
+
+
+def close_times(index, duration, base_tz):
+    # When each bar's values become known, comparable with the base frame's index
+    if duration >= pd.Timedelta(days=1):
+        # Daily bars are session dates (tz-naive from Yahoo) and only close at 16:00 New York time
+        if base_tz is None:
+            return index.tz_localize(None).normalize() + SESSION_CLOSE
+        days = index.tz_localize(MARKET_TZ) if index.tz is None else index.tz_convert(MARKET_TZ)
+        return (days.normalize() + SESSION_CLOSE).tz_convert(base_tz)
+    if (index.tz is None) != (base_tz is None):
+        raise ValueError("intraday frames and the base frame must both be tz-aware or both tz-naive")
+    return index + duration
+
+
+def align_to_base(frame, duration, base_index):
+    # A bar's values are only known once it closes: shift to its close time and carry them forward
+    known = frame.dropna()
+    known.index = close_times(known.index, duration, base_index.tz)
+    return known.reindex(known.index.union(base_index)).ffill().reindex(base_index)
+
+
+def precompute(ticker_frames, frames=FRAMES, base=BASE_FRAME):
+    # Indicator work that doesn't depend on weights or thresholds, aligned to the base bars
+    base_df = ticker_frames.get(base)
+    if base_df is None or base_df.empty:
+        return None
+    base_index = base_df.index
+    base_ind = frame_indicators(base_df)
+    aligned = {}
+    for tf, params in frames.items():
+        df = ticker_frames.get(tf)
+        if df is None or df.empty:
+            continue
+        ind = base_ind if tf == base else frame_indicators(df)
+        # Values are read at the close of each base bar, so the base frame needs no shift
+        duration = pd.Timedelta(0) if tf == base else bar_duration(tf, params)
+        aligned[tf] = align_to_base(ind[["RSI", "MACD", "Signal"]], duration, base_index)
+    base_ind["Open"] = base_df["Open"] if "Open" in base_df.columns else base_df["Close"]
+    base_ind["Close"] = base_df["Close"]
+    return {"base": base_ind, "frames": aligned}
+
+
+def signals_from(pre, weights, rsi_low=30, rsi_high=70):
+    if pre is None:
+        return pd.DataFrame()
+    scores = pd.DataFrame({tf: frame_score(ind, rsi_low, rsi_high) for tf, ind in pre["frames"].items()}, index=pre["base"].index)
+    weights = pd.Series({tf: weights.get(tf, 0.25) for tf in scores.columns}, dtype=float)
+    valid = scores.notna()
+    conf = (scores.fillna(0) * weights).sum(axis=1)
+    valid_weights = (valid * weights.abs()).sum(axis=1)
+    out = pre["base"].copy()
+    out["Confidence"] = (conf / (2 * valid_weights)).where(valid_weights > 0, 0) * 100
+    out["BullishFrames"] = (scores > 0).sum(axis=1)
+    return out
+
+
+def build_signals(ticker_frames, frames=FRAMES, rsi_low=30, rsi_high=70, base=BASE_FRAME):
+    weights = {tf: params.get("weight", 0.25) for tf, params in frames.items()}
+    return signals_from(precompute(ticker_frames, frames, base), weights, rsi_low, rsi_high)
+
+
+def _next_true(mask):
+    # For every bar, the index of the first True at or after it (len(mask) if none)
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+def _fill_prices(sig, bars):
+    n = len(sig)
+    opens = sig["Open"].to_numpy()
+    closes = sig["Close"].to_numpy()
+    return np.where(bars + 1 < n, opens[np.minimum(bars + 1, n - 1)], closes[bars])
+
+
+@metrics.timed("simulate")
+def simulate(sig, rsi_entry=(30, 60), rvol_entry=1.5, rsi_exit=70, rvol_exit=1.0, min_confidence=None, base_minutes=1):
+    if sig.empty:
+        return pd.DataFrame()
+    rsi_v, macd_v, signal_v, rvol_v = (sig[c].to_numpy() for c in ("RSI", "MACD", "Signal", "RVOL"))
+    with np.errstate(invalid="ignore"):
+        entry = (rsi_v > rsi_entry[0]) & (rsi_v < rsi_entry[1]) & (macd_v > signal_v) & (rvol_v >= rvol_entry)
+        exit_rule = (rsi_v > rsi_exit) & (macd_v < signal_v) & (rvol_v < rvol_exit)
+    if min_confidence is not None:
+        entry &= sig["Confidence"].to_numpy() >= min_confidence
+
+    n = len(sig)
+    # Decisions are made at a bar's close and filled at the next bar's open
+    entry[-1] = False
+    hold_bars = np.maximum(sig["BullishFrames"].to_numpy(), 1) * 5 // base_minutes
+    next_exit = _next_true(exit_rule)
+    candidates = np.flatnonzero(entry)
+    if len(candidates) == 0:
+        return pd.DataFrame()
+    shifted = np.append(next_exit[1:], n)[candidates]
+    timed = np.minimum(candidates + hold_bars[candidates], n - 1)
+    exits = np.minimum(shifted, timed)
+    reasons = np.where(shifted <= timed, "exit rule", "hold time")
+
+    # Trades can't overlap: walk the candidate list, jumping past each trade's exit
+    chosen = []
+    i = 0
+    while i < len(candidates):
+        chosen.append(i)
+        i = int(np.searchsorted(candidates, exits[i], side="right"))
+    chosen = np.array(chosen)
+
+    entries, exit_bars = candidates[chosen], exits[chosen]
+    entry_px, exit_px = _fill_prices(sig, entries), _fill_prices(sig, exit_bars)
+    index = sig.index
+    return pd.DataFrame({
+        "entry_time": index[np.minimum(entries + 1, n - 1)],
+        "exit_time": index[np.minimum(exit_bars + 1, n - 1)],
+        "entry_price": entry_px,
+        "exit_price": exit_px,
+        "return": exit_px / entry_px - 1,
+        "bars_held": exit_bars - entries,
+        "confidence": sig["Confidence"].to_numpy()[entries],
+        "exit_reason": reasons[chosen],
+    })
+
+
+def summarize(trades):
+    if trades.empty:
+        return {"trades": 0}
+    returns = trades["return"]
+    equity = (1 + returns).cumprod()
+    gains, losses = returns[returns > 0].sum(), -returns[returns < 0].sum()
+    return {
+        "trades": int(len(trades)),
+        "win_rate": float((returns > 0).mean()),
+        "avg_return": float(returns.mean()),
+        "total_return": float(equity.iloc[-1] - 1),
+        "profit_factor": float(gains / losses) if losses > 0 else float("inf"),
+        "max_drawdown": float((equity / equity.cummax() - 1).min()),
+        "avg_bars_held": float(trades["bars_held"].mean()),
+    }
+
+
+def load_history(tickers, frames=FRAMES, store=None):
+    # Replays everything in the bar store; nothing is downloaded
+    frames = {tf: {**params, "period": None} for tf, params in frames.items()}
+    return fetch_frames(tickers, frames, store=store or get_store(), refresh=False)
+
+
+def run(tickers, frames=FRAMES, store=None, **rules):
+    history = load_history(tickers, frames, store)
+    all_trades = []
+    for ticker in tickers:
+        trades = simulate(build_signals(history[ticker], frames), **rules)
+        if not trades.empty:
+            all_trades.append(trades.assign(symbol=ticker))
+    trades = pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame()
+    stats = {"ALL": summarize(trades)}
+    if not trades.empty:
+        for ticker, group in trades.groupby("symbol"):
+            stats[ticker] = summarize(group)
+    return trades, pd.DataFrame(stats).T
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the multi-timeframe confidence signals on stored bars")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--min-confidence", type=float, help="only enter when confidence is at least this")
+    parser.add_argument("--out", help="write per-trade results to CSV")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    trades, stats = run([t.upper() for t in args.tickers], min_confidence=args.min_confidence)
+    elapsed = time.perf_counter() - started
+
+    if args.out and not trades.empty:
+        trades.to_csv(args.out, index=False)
+        print(f"💾 Wrote {len(trades)} trades to {args.out}")
+    print("\n📊 Backtest Results:\n")
+    print(stats.to_string())
+    print(f"\n⏱️ Backtest finished in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
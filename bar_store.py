@@ -0,0 +1,272 @@
+import io
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import metrics
+from market_data import OHLCV, align_timestamp, get_provider
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".trading_assistant", "bars")
+COLUMNS = ["ts"] + [col.lower() for col in OHLCV]
+# Opened (symbol, interval) column sets kept mapped; each costs one mmap per column
+MAX_OPEN = 2048
+
+
+def period_to_days(period):
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period or "")
+    if not match:
+        return None
+    n, unit = int(match.group(1)), match.group(2)
+    return n * {"d": 1, "wk": 7, "mo": 31, "y": 366}[unit]
+
+
+def _slice_start(ts, interval, period):
+    days = period_to_days(period)
+    if days is None or len(ts) == 0:
+        return 0
+    if interval.endswith(("m", "h")):
+        # Intraday periods count sessions, like Yahoo does, not calendar days
+        day = ts // 86_400_000_000_000
+        boundaries = np.flatnonzero(np.diff(day)) + 1
+        if len(boundaries) < days:
+            return 0
+        return int(boundaries[-days])
+    cutoff = ts[-1] - days * 86_400_000_000_000
+    return int(np.searchsorted(ts, cutoff, side="right"))
+
+
+class BarStore:
+    # Columnar bar cache: one memory-mapped .npy per column under <root>/<interval>/<SYMBOL>/
+    def __init__(self, root=None):
+        self.root = root or os.environ.get("BAR_STORE_DIR", DEFAULT_ROOT)
+        self.locks = {}
+        self.locks_guard = threading.Lock()
+        # (symbol, interval) -> (ts.npy stat, columns, tz, layout), so refreshes don't re-parse .npy headers;
+        # layout holds each column file's (data offset, length, dtype) for in-place appends
+        self.opened = OrderedDict()
+        self.opened_lock = threading.Lock()
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol.replace("/", "_"))
+
+    def _meta(self, symbol, interval):
+        path = os.path.join(self._dir(symbol, interval), "meta.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    @contextmanager
+    def lock(self, symbol, interval):
+        # Serializes read-merge-write per (symbol, interval): threads share a lock, processes an flock
+        with self.locks_guard:
+            lock = self.locks.setdefault((symbol, interval), threading.Lock())
+        path = self._dir(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(path, ".lock"), "w") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _stamp(self, symbol, interval):
+        try:
+            st = os.stat(os.path.join(self._dir(symbol, interval), "ts.npy"))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _remember(self, key, stamp, cols, tz, layout):
+        with self.opened_lock:
+            self.opened[key] = (stamp, cols, tz, layout)
+            self.opened.move_to_end(key)
+            while len(self.opened) > MAX_OPEN:
+                self.opened.popitem(last=False)
+
+    def _open(self, symbol, interval):
+        # Returns (columns trimmed to a common length, tz, layout), reusing the mapping while ts.npy is unchanged
+        key = (symbol, interval)
+        stamp = self._stamp(symbol, interval)
+        if stamp is None:
+            with self.opened_lock:
+                self.opened.pop(key, None)
+            return None
+        with self.opened_lock:
+            cached = self.opened.get(key)
+            if cached is not None and cached[0] == stamp:
+                self.opened.move_to_end(key)
+                return cached[1:]
+        path = self._dir(symbol, interval)
+        cols = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+        layout = {name: (arr.offset, len(arr), arr.dtype) for name, arr in cols.items()}
+        n = min(len(arr) for arr in cols.values())
+        cols = {name: arr[:n] for name, arr in cols.items()}
+        tz = self._meta(symbol, interval).get("tz")
+        self._remember(key, stamp, cols, tz, layout)
+        return cols, tz, layout
+
+    @staticmethod
+    def _slice(cols, interval, period):
+        start = _slice_start(cols["ts"], interval, period) if period else 0
+        # Slicing a memmap returns a view, so no bar data is copied here
+        return {name: arr[start:] for name, arr in cols.items()}
+
+    def columns(self, symbol, interval, period=None):
+        opened = self._open(symbol, interval)
+        return self._slice(opened[0], interval, period) if opened is not None else None
+
+    def last_timestamp(self, symbol, interval):
+        cols = self.columns(symbol, interval)
+        if cols is None or len(cols["ts"]) == 0:
+            return None
+        return pd.Timestamp(int(cols["ts"][-1]), tz="UTC")
+
+    def frame(self, symbol, interval, period=None):
+        opened = self._open(symbol, interval)
+        if opened is None:
+            return pd.DataFrame()
+        cols, tz, _ = opened
+        cols = self._slice(cols, interval, period)
+        index = pd.to_datetime(np.asarray(cols["ts"]), utc=True)
+        index = index.tz_convert(tz) if tz else index.tz_localize(None)
+        data = {col: np.asarray(cols[col.lower()]) for col in OHLCV}
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def write(self, symbol, interval, df):
+        if df is None or df.empty:
+            return
+        df = df[[col for col in OHLCV if col in df.columns]].dropna(how="all")
+        index = df.index
+        tz = None
+        if index.tz is not None:
+            # Fixed-offset zones (e.g. parsed from CSV) can't be named, so they are kept as UTC
+            tz = getattr(index.tz, "zone", None) or getattr(index.tz, "key", None) or "UTC"
+        new_ts = (index.tz_convert("UTC") if tz else index).asi8
+
+        path = self._dir(symbol, interval)
+        with self.lock(symbol, interval):
+            opened = self._open(symbol, interval)
+            new = {name: self._values(df, name, new_ts) for name in COLUMNS}
+            if opened is not None and len(opened[0]["ts"]):
+                old, old_tz, layout = opened
+                # The previously stored last bar may have been partial, so new bars win on overlap
+                keep = int(np.searchsorted(old["ts"], new_ts[0], side="left"))
+                if old_tz == tz and self._append(path, new, keep, layout):
+                    self._reopen(symbol, interval, path, keep + len(new_ts), tz)
+                    return
+                new = {name: np.concatenate([np.asarray(old[name][:keep]), values]) for name, values in new.items()}
+
+            suffix = f"{os.getpid()}.{threading.get_ident()}"
+            for name, values in new.items():
+                tmp = os.path.join(path, f".{name}.{suffix}.npy")
+                np.save(tmp, values)
+                os.replace(tmp, os.path.join(path, f"{name}.npy"))
+            tmp = os.path.join(path, f".meta.{suffix}.json")
+            with open(tmp, "w") as f:
+                json.dump({"tz": tz}, f)
+            os.replace(tmp, os.path.join(path, "meta.json"))
+
+    @staticmethod
+    def _header(dtype, n):
+        buf = io.BytesIO()
+        np.lib.format.write_array_header_1_0(buf, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (n,)})
+        return buf.getvalue()
+
+    def _append(self, path, new, keep, layout):
+        # Writes the new bars over each column from keep onward and patches the .npy header in place.
+        # Returns False, having touched nothing, when a column can't take it (header size or dtype
+        # changes, or the file would shrink under readers still mapping it); the caller then rewrites.
+        total = keep + len(new["ts"])
+        plan = {}
+        for name, values in new.items():
+            offset, length, dtype = layout[name]
+            header = self._header(dtype, total)
+            if dtype != values.dtype or length > total or len(header) != offset:
+                return False
+            plan[name] = (offset, header)
+        # ts goes last, so a reader that sees the longer ts also sees every other column's new bars
+        for name in COLUMNS[1:] + COLUMNS[:1]:
+            offset, header = plan[name]
+            values = new[name]
+            with open(os.path.join(path, f"{name}.npy"), "r+b") as f:
+                f.seek(offset + keep * values.itemsize)
+                f.write(values.tobytes())
+                f.seek(0)
+                f.write(header)
+        return True
+
+    def _reopen(self, symbol, interval, path, n, tz):
+        # Maps the grown columns straight from the known header size instead of parsing them again
+        cols, layout = {}, {}
+        for name in COLUMNS:
+            dtype = np.dtype("int64" if name == "ts" else "float64")
+            offset = len(self._header(dtype, n))
+            cols[name] = np.memmap(os.path.join(path, f"{name}.npy"), dtype=dtype, mode="r", offset=offset, shape=(n,))
+            layout[name] = (offset, n, dtype)
+        self._remember((symbol, interval), self._stamp(symbol, interval), cols, tz, layout)
+
+    @staticmethod
+    def _values(df, name, ts):
+        if name == "ts":
+            return np.asarray(ts, dtype="int64")
+        col = name.capitalize()
+        if col not in df.columns:
+            return np.full(len(df), np.nan)
+        return df[col].to_numpy(dtype="float64")
+
+    def update(self, tickers, interval, period, provider=None):
+        provider = provider or get_provider()
+        days = period_to_days(period)
+        now = pd.Timestamp.now(tz="UTC")
+        cold, warm = [], {}
+        for ticker in tickers:
+            last = self.last_timestamp(ticker, interval)
+            if last is None or (days is not None and now - last > pd.Timedelta(days=days)):
+                cold.append(ticker)
+            else:
+                warm[ticker] = last
+
+        metrics.hit(f"bar_store_{interval}", len(warm))
+        metrics.miss(f"bar_store_{interval}", len(cold))
+        if cold:
+            for ticker, df in provider.download(cold, interval, period=period).items():
+                self.write(ticker, interval, df)
+        if warm:
+            start = min(warm.values())
+            for ticker, df in provider.download(list(warm), interval, start=start).items():
+                self.write(ticker, interval, df[df.index >= align_timestamp(df.index, warm[ticker])])
+
+    def load(self, tickers, interval, period, provider=None, refresh=True):
+        if refresh:
+            self.update(tickers, interval, period, provider)
+        out = {}
+        with metrics.stage("bar_store_read"):
+            for ticker in tickers:
+                df = self.frame(ticker, interval, period)
+                if not df.empty:
+                    out[ticker] = df
+        return out
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = BarStore()
+    return _store
@@ -0,0 +1,315 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+import fundamentals
+import gappers
+import metrics
+import news
+import risk
+import scanner
+import volume_index
+from bar_store import BarStore, period_to_days
+from market_data import align_timestamp, fetch_frames
+from signal_engine import FRAMES, compute_signals
+from streaming_indicators import SignalBook
+
+SIZES = [10, 100, 1000, 5000]
+# Last session of the synthetic calendar; bars exist up to the provider's `now`
+REFERENCE_DAY = pd.Timestamp("2024-06-14")
+MARKET_TZ = "America/New_York"
+# Sessions (intraday) or calendar days (daily) of history each interval can serve, like Yahoo's limits
+HISTORY = {"1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "60m": 60, "1h": 60, "1d": 400}
+STEP_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "1h": 60}
+
+
+def _seed(*parts):
+    return zlib.crc32(":".join(parts).encode())
+
+
+def synthetic_universe(n):
+    # Deterministic four-letter symbols: AAAA, AAAB, ...
+    return ["".join(chr(65 + i // 26 ** p % 26) for p in (3, 2, 1, 0)) for i in range(n)]
+
+
+class SyntheticProvider:
+    # Deterministic random-walk bars standing in for yf.download; same symbol and bar, same values
+    def __init__(self, now=None):
+        self.now = pd.Timestamp(now or REFERENCE_DAY + pd.Timedelta(hours=15), tz=MARKET_TZ)
+        self.calendars = {}
+        self.calls = []
+
+    def calendar(self, interval):
+        index = self.calendars.get(interval)
+        if index is None:
+            if interval in STEP_MINUTES:
+                days = pd.bdate_range(end=REFERENCE_DAY, periods=HISTORY[interval])
+                step = STEP_MINUTES[interval]
+                offsets = pd.to_timedelta(np.arange(570, 960, step), unit="min")
+                index = pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel())
+                index = index.tz_localize(MARKET_TZ)
+            else:
+                # Yahoo returns daily bars as tz-naive session dates
+                index = pd.bdate_range(REFERENCE_DAY - pd.Timedelta(days=HISTORY[interval]), REFERENCE_DAY)
+            self.calendars[interval] = index
+        return index
+
+    def bars(self, ticker, interval):
+        index = self.calendar(interval)
+        rng = np.random.default_rng(_seed(ticker, interval))
+        n = len(index)
+        base = 2 + _seed(ticker) % 4800 / 100
+        vol = 0.002 if interval in STEP_MINUTES else 0.02
+        close = base * np.exp(np.cumsum(rng.normal(0, vol, n)))
+        open_ = np.r_[close[0], close[:-1]]
+        wick = np.abs(rng.normal(0, vol / 2, (2, n)))
+        high = np.maximum(open_, close) * (1 + wick[0])
+        low = np.minimum(open_, close) * (1 - wick[1])
+        volume = np.round(rng.lognormal(8 if interval in STEP_MINUTES else 13, 1, n))
+        return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+    def download(self, tickers, interval, period=None, start=None):
+        tickers = list(tickers)
+        self.calls.append((len(tickers), interval, period, start))
+        index = self.calendar(interval)
+        now = self.now if index.tz is not None else self.now.tz_localize(None)
+        upto = index <= now if interval in STEP_MINUTES else index.normalize() <= now.normalize()
+        keep = upto.copy()
+        if start is not None:
+            keep &= index >= align_timestamp(index, start)
+        elif period_to_days(period) is not None:
+            days = period_to_days(period)
+            if interval in STEP_MINUTES:
+                sessions = np.unique(index[upto].normalize())[-days:]
+                keep &= index.normalize().isin(sessions)
+            else:
+                keep &= index > now.normalize() - pd.Timedelta(days=days)
+        with metrics.stage(f"download_{interval}"):
+            return {ticker: self.bars(ticker, interval)[keep] for ticker in tickers}
+
+
+class SyntheticResponse:
+    def __init__(self, payload=None, text=None, status_code=200):
+        self.status_code = status_code
+        self.text = text if text is not None else json.dumps(payload)
+        self.content = self.text.encode()
+        self._payload = payload
+
+    def json(self):
+        return self._payload if self._payload is not None else json.loads(self.text)
+
+
+class SyntheticSession:
+    # Serves the Yahoo screener, Finviz snapshot and Yahoo news endpoints from the synthetic universe
+    def __init__(self, universe, provider):
+        self.universe = universe
+        self.provider = provider
+        self.headers = {}
+
+    def quote(self, symbol):
+        seed = _seed(symbol, "quote")
+        close = float(self.provider.bars(symbol, "1d")["Close"].iloc[-1])
+        return {
+            "symbol": symbol,
+            "shortName": f"{symbol} Corp",
+            "regularMarketPrice": round(close, 2),
+            "regularMarketChangePercent": 5 + seed % 4000 / 100,
+            "regularMarketVolume": 100_000 + seed % 20_000_000,
+        }
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        if "screener" in url:
+            # Each screener lists an overlapping two thirds of the universe, served a page at a time
+            params = params or {}
+            scr_id, start, count = params.get("scrIds", ""), int(params.get("start", 0)), int(params.get("count", 100))
+            members = [symbol for symbol in self.universe if _seed(symbol, scr_id) % 3]
+            quotes = [self.quote(symbol) for symbol in members[start:start + count]]
+            return SyntheticResponse({"finance": {"result": [{"quotes": quotes, "start": start, "total": len(members)}]}})
+        if "finviz" in url:
+            seed = _seed(url)
+            cells = f"<td>Shs Float</td><td><b>{1 + seed % 900 / 10:.1f}M</b></td><td>Short Float</td><td><b>{seed % 300 / 10:.2f}%</b></td>"
+            return SyntheticResponse(text=f"<html><table class=\"snapshot-table2\"><tr>{cells}</tr></table></html>")
+        if "search" in url:
+            symbol = (params or {}).get("q", "")
+            seed = _seed(symbol, "news")
+            words = ["surges on record earnings", "falls after weak guidance", "announces new product", "faces lawsuit", "upgraded by analysts"]
+            own = [{"uuid": f"{symbol}-{i}", "title": f"{symbol} {words[(seed + i) % len(words)]}", "link": f"https://news.example/{symbol}/{i}"} for i in range(3)]
+            # Market-wide stories shared across tickers exercise the dedupe path
+            shared = [{"uuid": f"market-{(seed + i) % 50}", "title": f"Stocks {words[(seed + i) % len(words)]}", "link": f"https://news.example/market/{(seed + i) % 50}"} for i in range(2)]
+            return SyntheticResponse({"news": own + shared})
+        return SyntheticResponse({}, status_code=404)
+
+
+class SyntheticTicker:
+    def __init__(self, symbol, provider):
+        self.symbol = symbol
+        self.provider = provider
+
+    def history(self, period="1mo", **kwargs):
+        return self.provider.download([self.symbol], "1d", period=period).get(self.symbol, pd.DataFrame())
+
+
+class SyntheticYFinance:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def Ticker(self, symbol):
+        return SyntheticTicker(symbol, self.provider)
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # No procfs: fall back to the process-lifetime peak (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if os.uname().sysname == "Darwin" else peak / 1024
+
+
+class MemorySampler:
+    # Polls resident memory on a thread; tracemalloc would slow pandas down several-fold and skew timings
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = self.start = _rss_mb()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, _rss_mb())
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, _rss_mb())
+
+
+def measure(name, size, func):
+    metrics.reset()
+    with MemorySampler() as memory:
+        started = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - started
+    return {
+        "stage": name,
+        "symbols": size,
+        "seconds": round(seconds, 4),
+        "symbols_per_s": round(size / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": round(memory.peak, 1),
+        "delta_mb": round(memory.peak - memory.start, 1),
+        "substages": metrics.snapshot(),
+    }
+
+
+def run_size(size, workdir, workers):
+    universe = synthetic_universe(size)
+    provider = SyntheticProvider()
+    session = SyntheticSession(universe, provider)
+    store = BarStore(os.path.join(workdir, f"bars_{size}"))
+    # gappers reads RVOL history through yf.Ticker; point it at the synthetic bars
+    gappers.yf = SyntheticYFinance(provider)
+    fundamentals.set_cache(fundamentals.FundamentalsCache(os.path.join(workdir, f"fundamentals_{size}.json")))
+    memo = news.SentimentMemo(os.path.join(workdir, f"sentiment_{size}.json"))
+    index = volume_index.VolumeIndex(os.path.join(workdir, f"volume_index_{size}"))
+    volume_index.set_index(index)
+    signals = {}
+    snapshot = scanner.Snapshot("gappers", os.path.join(workdir, f"screeners_{size}"))
+
+    def advance():
+        provider.now += pd.Timedelta(minutes=1)
+        fetch_frames(universe, FRAMES, provider=provider, store=store)
+
+    stages = [
+        # Nightly job; it gets its own store so the frame loads below still start cold
+        ("volume_index", lambda: index.build(universe, store=BarStore(os.path.join(workdir, f"index_bars_{size}")), provider=provider)),
+        ("gapper_scan", lambda: gappers.load_gappers(max_price=float("inf"), max_workers=workers, session=session, snapshot=snapshot, max_results=size)),
+        # Same screeners again: nothing is new, so nothing is enriched
+        ("gapper_rescan", lambda: gappers.load_gappers(max_price=float("inf"), max_workers=workers, session=session, snapshot=snapshot, max_results=size)),
+        ("frames_cold", lambda: fetch_frames(universe, FRAMES, provider=provider, store=store)),
+        ("frames_warm", advance),
+        ("signals", lambda: signals.update(results=compute_signals(universe, SignalBook(), FRAMES, store=store, provider=provider, refresh=False)[0])),
+        ("risk", lambda: risk.plan_positions(signals["results"], 100_000, store=store, provider=provider, refresh=False)),
+        ("news", lambda: news.load_news(universe, session=session, max_workers=workers, memo=memo)),
+    ]
+    rows = [measure(name, size, func) for name, func in stages]
+    total = sum(row["seconds"] for row in rows if row["stage"] not in ("volume_index", "gapper_rescan"))
+    rows.append({
+        "stage": "end_to_end", "symbols": size, "seconds": round(total, 4),
+        "symbols_per_s": round(size / total, 1) if total > 0 else None,
+        "peak_rss_mb": max(row["peak_rss_mb"] for row in rows), "delta_mb": max(row["delta_mb"] for row in rows),
+    })
+    return rows
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(rows, baseline_path, tolerance):
+    # A stage regresses when it is more than `tolerance` slower than the baseline run for the same size
+    baseline = {}
+    with open(baseline_path) as f:
+        for line in f:
+            row = json.loads(line)
+            baseline[(row["stage"], row["symbols"])] = row["seconds"]
+    regressions = []
+    for row in rows:
+        before = baseline.get((row["stage"], row["symbols"]))
+        if before and row["seconds"] > before * (1 + tolerance):
+            regressions.append(f"{row['stage']} @ {row['symbols']}: {before:.3f}s -> {row['seconds']:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the signal pipeline offline on synthetic market data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="universe sizes to run")
+    parser.add_argument("--workers", type=int, default=gappers.MAX_WORKERS)
+    parser.add_argument("--out", help="append results as JSON lines to this file")
+    parser.add_argument("--baseline", help="JSON lines from an earlier run; exit 1 if any stage regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="trading_bench_")
+    revision, now = git_revision(), time.time()
+    rows = []
+    try:
+        for size in args.sizes:
+            print(f"\n⏱️ {size} symbols")
+            for row in run_size(size, workdir, args.workers):
+                row = {"time": now, "revision": revision, **row}
+                rows.append(row)
+                print(f"  {row['stage']:<12} {row['seconds']:>9.3f}s {row['symbols_per_s'] or 0:>10.1f} sym/s  peak {row['peak_rss_mb']:>8.1f} MB (+{row['delta_mb']:.1f})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        with open(args.out, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        print(f"\n💾 Wrote {len(rows)} rows to {args.out}")
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions:\n  " + "\n  ".join(regressions))
+            raise SystemExit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
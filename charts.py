@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import metrics
+
+# Roughly one point per horizontal pixel of a wide-layout chart
+MAX_POINTS = 600
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: indices of the points that keep a line's visual shape
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype="int64")
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt = slice(end, edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_ohlc(df, max_points=MAX_POINTS):
+    # Min/max bucketing: every candle keeps the true open, high, low and close of the bars it covers
+    if len(df) <= max_points:
+        return df
+    groups = np.arange(len(df)) * max_points // len(df)
+    agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last"}
+    out = df[list(agg)].groupby(groups).agg(agg)
+    out.index = df.index[np.searchsorted(groups, out.index)]
+    return out
+
+
+def downsample_line(series, max_points=MAX_POINTS):
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    keep = lttb(series.index.asi8, series.to_numpy(), max_points)
+    return series.iloc[keep]
+
+
+@metrics.timed("render_chart")
+def build_chart(df, title=None, max_points=MAX_POINTS):
+    # plotly is imported on first use so pages that never draw a chart don't pay for it at startup
+    import plotly.graph_objs as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.03, row_heights=[0.6, 0.2, 0.2])
+    if {"Open", "High", "Low"} <= set(df.columns):
+        candles = downsample_ohlc(df, max_points)
+        fig.add_trace(go.Candlestick(x=candles.index, open=candles["Open"], high=candles["High"], low=candles["Low"], close=candles["Close"], name="Price"), row=1, col=1)
+    else:
+        price = downsample_line(df["Close"], max_points)
+        fig.add_trace(go.Scatter(x=price.index, y=price, name="Price", line=dict(color="blue")), row=1, col=1)
+
+    if "RSI" in df.columns:
+        rsi = downsample_line(df["RSI"], max_points)
+        fig.add_trace(go.Scatter(x=rsi.index, y=rsi, name="RSI", line=dict(color="orange")), row=2, col=1)
+        for level in (30, 70):
+            fig.add_hline(y=level, line=dict(color="gray", dash="dot", width=1), row=2, col=1)
+
+    if {"MACD", "Signal"} <= set(df.columns):
+        hist = (df["MACD"] - df["Signal"]).dropna()
+        if len(hist) > max_points:
+            # Bars can't be thinned like a line, so each bucket shows its largest move
+            groups = np.arange(len(hist)) * max_points // len(hist)
+            hist = hist.iloc[pd.Series(np.abs(hist.to_numpy())).groupby(groups).idxmax().to_numpy()]
+        fig.add_trace(go.Bar(x=hist.index, y=hist, name="Histogram", marker_color=np.where(hist >= 0, "green", "red")), row=3, col=1)
+        for col, color in (("MACD", "blue"), ("Signal", "red")):
+            line = downsample_line(df[col], max_points)
+            fig.add_trace(go.Scatter(x=line.index, y=line, name=col, line=dict(color=color, width=1)), row=3, col=1)
+
+    fig.update_layout(
+        title=title,
+        height=550,
+        showlegend=False,
+        xaxis_rangeslider_visible=False,
+        margin=dict(l=10, r=10, t=30 if title else 20, b=20),
+    )
+    fig.update_yaxes(title_text="Price", row=1, col=1)
+    fig.update_yaxes(title_text="RSI", range=[0, 100], row=2, col=1)
+    fig.update_yaxes(title_text="MACD", row=3, col=1)
+    return fig
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+INDICATOR_COLUMNS = ["RSI", "MACD", "Signal"]
+# Bars kept per timeframe; a frame's "retention" param overrides this
+RETENTION = {"1m": 500, "2m": 500, "3m": 500, "5m": 500, "10m": 400, "15m": 400, "30m": 300, "1h": 300, "1d": 250}
+DEFAULT_RETENTION = 500
+
+
+def retention_for(tf, params=None):
+    return (params or {}).get("retention") or RETENTION.get(tf, DEFAULT_RETENTION)
+
+
+class BarFrame:
+    # Compact per-symbol bars: int64 epoch-ns timestamps (UTC), float32 prices and indicators, uint32/uint64 volume.
+    # Slicing returns views, so tails and last rows never copy the underlying arrays.
+    __slots__ = ("ts", "columns", "tz")
+
+    def __init__(self, ts, columns, tz=None):
+        self.ts = ts
+        self.columns = columns
+        self.tz = tz
+
+    @classmethod
+    def from_frame(cls, df, retention=None):
+        if df is None or df.empty:
+            return cls(np.empty(0, dtype="int64"), {})
+        if retention:
+            df = df.iloc[-retention:]
+        index = df.index
+        tz = index.tz
+        if tz is not None:
+            index = index.tz_convert("UTC")
+        columns = {}
+        for col in PRICE_COLUMNS + INDICATOR_COLUMNS:
+            if col in df.columns:
+                columns[col] = np.ascontiguousarray(df[col].to_numpy(dtype="float32"))
+        if "Volume" in df.columns:
+            volume = np.nan_to_num(df["Volume"].to_numpy(dtype="float64")).clip(0)
+            columns["Volume"] = volume.astype("uint32" if len(volume) == 0 or volume.max() < 2 ** 32 else "uint64")
+        return cls(np.ascontiguousarray(index.asi8), columns, tz)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def empty(self):
+        return len(self.ts) == 0
+
+    @property
+    def index(self):
+        index = pd.to_datetime(self.ts, utc=True)
+        return index.tz_convert(self.tz) if self.tz else index.tz_localize(None)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + sum(arr.nbytes for arr in self.columns.values())
+
+    def tail(self, n):
+        # Not ts[-n:]: for n == 0 that is the whole series
+        start = max(len(self.ts) - n, 0)
+        return BarFrame(self.ts[start:], {name: arr[start:] for name, arr in self.columns.items()}, self.tz)
+
+    def last(self):
+        if self.empty:
+            return {}
+        row = {name: arr[-1].item() for name, arr in self.columns.items()}
+        row["time"] = pd.Timestamp(int(self.ts[-1]), tz="UTC").tz_convert(self.tz or "UTC")
+        return row
+
+    def to_frame(self):
+        # Float32 columns go straight into the frame, so charts don't upcast to float64
+        data = {name: arr for name, arr in self.columns.items()}
+        return pd.DataFrame(data, index=self.index, copy=False)
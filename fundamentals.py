@@ -0,0 +1,108 @@
+import html
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import metrics
+
+FINVIZ_URL = "https://finviz.com/quote.ashx?t={symbol}"
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".trading_assistant", "fundamentals.json")
+METRICS = {"Float": "Shs Float", "Short %": "Short Float"}
+MARKET_TZ = ZoneInfo("America/New_York")
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def parse_snapshot(page, labels=METRICS.values()):
+    # Reads only the requested cells of Finviz's snapshot table instead of parsing every table
+    values = {}
+    for label in labels:
+        pattern = r">\s*" + re.escape(label) + r"\s*(?:</[^>]+>\s*)*</td>\s*<td[^>]*>(.*?)</td>"
+        match = re.search(pattern, page, re.S)
+        if match:
+            value = html.unescape(TAG_RE.sub("", match.group(1))).strip()
+            values[label] = value or "-"
+    return values
+
+
+def next_rollover(now=None):
+    # Float and short interest change at most once a day; entries expire before the next premarket
+    now = datetime.fromtimestamp(now or time.time(), MARKET_TZ)
+    rollover = now.replace(hour=4, minute=0, second=0, microsecond=0)
+    if now >= rollover:
+        rollover += timedelta(days=1)
+    while rollover.weekday() >= 5:
+        rollover += timedelta(days=1)
+    return rollover.timestamp()
+
+
+class FundamentalsCache:
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("FUNDAMENTALS_CACHE", DEFAULT_PATH)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def get(self, symbol):
+        entry = self.entries.get(symbol)
+        if entry is None or entry["expires"] <= time.time():
+            return None
+        return entry["values"]
+
+    def set(self, symbol, values):
+        with self.lock:
+            self.entries[symbol] = {"values": values, "expires": next_rollover()}
+            self.dirty = True
+
+    def fetch(self, symbol, session, timeout=10):
+        values = self.get(symbol)
+        if values is not None:
+            metrics.hit("finviz")
+            return values
+        metrics.miss("finviz")
+        with metrics.stage("finviz"):
+            response = session.get(FINVIZ_URL.format(symbol=symbol), timeout=timeout)
+        metrics.add_bytes("finviz", len(response.content))
+        if response.status_code != 200:
+            return {name: "-" for name in METRICS}
+        with metrics.stage("finviz_parse"):
+            found = parse_snapshot(response.text)
+        values = {name: found.get(label, "-") for name, label in METRICS.items()}
+        self.set(symbol, values)
+        return values
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = FundamentalsCache()
+    return _cache
+
+
+def set_cache(cache):
+    global _cache
+    _cache = cache
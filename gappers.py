@@ -0,0 +1,199 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import metrics
+from fundamentals import get_cache
+from http_client import get_client
+from scanner import MAX_RESULTS, fetch_screeners, get_snapshot, merge
+from volume_index import get_index
+
+MAX_WORKERS = 8
+TIMEOUT = 10
+HISTORY_HOST = "query2.finance.yahoo.com"
+
+
+def parse_quotes(quotes):
+    rows = []
+    for item in quotes:
+        # Before the open the screeners still rank by the last session; the pre-market move is the gap
+        market = "preMarket" if item.get("marketState") == "PRE" and "preMarketPrice" in item else "regularMarket"
+        try:
+            rows.append({
+                "Symbol": item["symbol"],
+                "Name": item.get("shortName", ""),
+                "Price": float(item[f"{market}Price"]),
+                "Gap %": round(float(item[f"{market}ChangePercent"]), 2),
+                "Volume": int(item.get("regularMarketVolume", 0)),
+            })
+        except (KeyError, TypeError, ValueError):
+            continue
+    return rows
+
+
+def filter_price(rows, max_price=50):
+    return [row for row in rows if row["Price"] < max_price]
+
+
+def join_rvol(rows, index=None):
+    # Vectorized RVOL from the nightly volume index: vs the 10-day average, and vs the
+    # average cumulative volume by this minute of the session. Symbols not in the index get None.
+    if not rows:
+        return rows
+    index = index or get_index()
+    symbols = [row["Symbol"] for row in rows]
+    volumes = [row["Volume"] for row in rows]
+    daily = index.rvol(symbols, volumes, 10)
+    intraday = index.time_of_day_rvol(symbols, volumes)
+    for row, rvol, tod in zip(rows, daily, intraday):
+        row["RVOL"] = round(float(rvol), 2) if np.isfinite(rvol) else None
+        row["RVOL (ToD)"] = round(float(tod), 2) if np.isfinite(tod) else None
+    return rows
+
+
+@metrics.timed("rvol_history")
+def fetch_avg_volume(symbol):
+    hist = get_client().call(HISTORY_HOST, yf.Ticker(symbol).history, period="10d")
+    return float(hist["Volume"].mean()) if not hist.empty else 0
+
+
+def fallback_rvol(row):
+    # RVOL from the row's current volume, so a carried-over average stays live as volume grows
+    avg_volume = row.get("Avg Volume") or 0
+    return round(row["Volume"] / avg_volume, 2) if avg_volume > 0 else None
+
+
+def fetch_float(symbol, session, timeout=TIMEOUT):
+    try:
+        values = get_cache().fetch(symbol, session, timeout)
+    except Exception:
+        return "-", "-"
+    return values["Float"], values["Short %"]
+
+
+def enrich_row(row, session, timeout=TIMEOUT):
+    row = dict(row)
+    if row.get("RVOL") is None:
+        # Not in the volume index yet (e.g. a new listing): fall back to a history download
+        metrics.miss("volume_index")
+        try:
+            row["Avg Volume"] = fetch_avg_volume(row["Symbol"])
+        except Exception:
+            row["Avg Volume"] = 0
+        row["RVOL"] = fallback_rvol(row)
+    else:
+        metrics.hit("volume_index")
+    float_val, short_float = fetch_float(row["Symbol"], session, timeout)
+    row["Float"] = float_val
+    row["Short %"] = short_float
+    return row
+
+
+def enriched(row):
+    # Failed lookups leave Float/Short % at "-" or the fallback average volume at 0; such rows are enriched
+    # again by the next scan instead of carried all day. Genuinely missing fundamentals come back from the
+    # fundamentals cache.
+    return row is not None and "-" not in (row.get("Float", "-"), row.get("Short %", "-")) and row.get("Avg Volume") != 0
+
+
+def enrich(rows, session=None, max_workers=MAX_WORKERS, timeout=TIMEOUT):
+    # Yields enriched rows in completion order so callers can show partial results
+    session = session or get_client()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(enrich_row, row, session, timeout) for row in rows]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def format_volume(volume):
+    return f"{volume/1e6:.1f}M" if volume >= 1e6 else f"{volume/1e3:.1f}K" if volume >= 1e3 else str(volume)
+
+
+def rank_change(symbol, diff):
+    if symbol in diff["new"]:
+        return "🆕"
+    moved = diff["moved"].get(symbol, 0)
+    return f"▲{moved}" if moved > 0 else f"▼{-moved}" if moved < 0 else ""
+
+
+def diff_summary(df):
+    # One line of what changed since the last scan; nothing on the first scan, when every name is new
+    diff = df.attrs.get("diff")
+    if not diff or not diff["dropped"] and len(diff["new"]) in (0, len(df)):
+        return None
+    return f"🆕 New: {', '.join(diff['new']) or '-'} · ❌ Dropped: {', '.join(diff['dropped']) or '-'}"
+
+
+def to_frame(rows, diff=None):
+    df = pd.DataFrame(rows).drop(columns=["Avg Volume"], errors="ignore")
+    if df.empty:
+        return df
+    df["Volume"] = df["Volume"].map(format_volume)
+    if "Screens" in df.columns:
+        df["Screens"] = df["Screens"].map(", ".join)
+    if diff is not None:
+        df.insert(1, "Δ Rank", df["Symbol"].map(lambda symbol: rank_change(symbol, diff)))
+    return df.sort_values(by="Gap %", ascending=False, kind="stable")
+
+
+def gapper_frame(rows, diff, stale, done):
+    df = to_frame(rows, diff)
+    df.attrs.update(stale=stale, diff=diff, done=done)
+    return df
+
+
+def scan_gappers(max_price=50, max_workers=MAX_WORKERS, timeout=TIMEOUT, session=None, snapshot=None, max_results=MAX_RESULTS, enrich_new=True, every=0.5):
+    # Yields the table as it fills in: screener rows first, again whenever enrichment has run for `every`
+    # seconds, and the finished table last. attrs carry the diff against the previous scan
+    # ({"new", "dropped", "moved"}), a stale flag and whether enrichment is done.
+    session = session or get_client()
+    snapshot = snapshot or get_snapshot()
+    results, stale, failed = fetch_screeners(session, max_results=max_results, timeout=timeout)
+    stale = stale or bool(failed)
+    quotes, screens = merge(results)
+    # The price filter runs before enrichment so discarded rows are never fetched
+    rows = join_rvol(filter_price(parse_quotes(quotes), max_price))
+    seen = set()
+    for row in rows:
+        seen.add(row["Symbol"])
+        row["Screens"] = screens[row["Symbol"]]
+        previous = snapshot.rows.get(row["Symbol"])
+        if enriched(previous):
+            # Already enriched by an earlier scan: float and short interest carry over, and so does the
+            # fallback average volume for symbols the volume index doesn't cover
+            for key in ("Float", "Short %"):
+                if key in previous:
+                    row[key] = previous[key]
+            if row["RVOL"] is None and "Avg Volume" in previous:
+                row["Avg Volume"] = previous["Avg Volume"]
+                row["RVOL"] = fallback_rvol(row)
+    # A screener that failed this time shouldn't make its names look dropped; they keep their last row
+    carried = [row for symbol, row in snapshot.rows.items() if symbol not in seen and set(row.get("Screens", [])) & failed]
+    rows = sorted(rows + carried, key=lambda row: row["Gap %"], reverse=True)
+    diff = snapshot.diff([row["Symbol"] for row in rows])
+
+    # Rows the index doesn't cover and that have no average volume carried over need the fallback too
+    fresh = [row for row in rows if not enriched(snapshot.rows.get(row["Symbol"])) or row["RVOL"] is None and "Avg Volume" not in row] if enrich_new else []
+    if enrich_new:
+        metrics.hit("gapper_snapshot", len(rows) - len(fresh))
+        metrics.miss("gapper_snapshot", len(fresh))
+    if fresh:
+        yield gapper_frame(rows, diff, stale, False)
+        position = {row["Symbol"]: i for i, row in enumerate(rows)}
+        last = time.perf_counter()
+        for row in enrich(fresh, session, max_workers, timeout):
+            rows[position[row["Symbol"]]] = row
+            if time.perf_counter() - last >= every:
+                yield gapper_frame(rows, diff, stale, False)
+                last = time.perf_counter()
+        get_cache().save()
+    snapshot.update(rows)
+    yield gapper_frame(rows, diff, stale, True)
+
+
+@metrics.timed("gapper_scan")
+def load_gappers(max_price=50, max_workers=MAX_WORKERS, timeout=TIMEOUT, session=None, snapshot=None, max_results=MAX_RESULTS, enrich_new=True):
+    for df in scan_gappers(max_price, max_workers, timeout, session, snapshot, max_results, enrich_new, every=float("inf")):
+        pass
+    return df
@@ -0,0 +1,223 @@
+import copy
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlencode, urlparse
+import requests
+import metrics
+from scheduler import RateLimiter
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = 10
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostPolicy:
+    def __init__(self, per_minute=120, burst=10, retries=3, backoff=0.5, max_backoff=8.0, failures=5, cooldown=30.0):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Consecutive failures that open the circuit, and how long it stays open
+        self.failures = failures
+        self.cooldown = cooldown
+
+
+# What each upstream tolerates before it starts throttling or banning
+POLICIES = {
+    "query1.finance.yahoo.com": HostPolicy(per_minute=120, burst=10),
+    "query2.finance.yahoo.com": HostPolicy(per_minute=120, burst=10),
+    "finviz.com": HostPolicy(per_minute=60, burst=5, cooldown=60.0),
+}
+DEFAULT_POLICY = HostPolicy()
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # Closed until `failures` calls fail in a row, then open for `cooldown` seconds;
+    # after that a single trial call is let through (half-open)
+    def __init__(self, failures=5, cooldown=30.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.count = 0
+        self.opened = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened is None:
+                return True
+            if time.monotonic() - self.opened >= self.cooldown and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.count = 0
+            self.opened = None
+            self.trial = False
+
+    def failure(self):
+        with self.lock:
+            self.count += 1
+            self.trial = False
+            if self.count >= self.failures:
+                self.opened = time.monotonic()
+
+    @property
+    def open(self):
+        return self.opened is not None
+
+
+def backoff_delay(attempt, base, cap):
+    # Full jitter: uniform between 0 and the exponential ceiling
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class HttpClient:
+    # One pooled keep-alive session for every upstream, governed per host. share splits each host's rate
+    # budget, for when that many processes (e.g. a scan's worker pool) each run their own client.
+    def __init__(self, policies=POLICIES, pool_size=16, stale_entries=256, share=1):
+        self.policies = policies
+        self.share = max(1, share)
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.limiters = {}
+        self.breakers = {}
+        self.inflight = {}
+        self.stale = OrderedDict()
+        self.stale_entries = stale_entries
+        self.lock = threading.Lock()
+
+    def policy(self, host):
+        host = host.lower()
+        for name, policy in self.policies.items():
+            if host == name or host.endswith("." + name):
+                return policy
+        return DEFAULT_POLICY
+
+    def _governors(self, host):
+        with self.lock:
+            if host not in self.limiters:
+                policy = self.policy(host)
+                self.limiters[host] = RateLimiter(policy.per_minute / self.share, max(1, policy.burst // self.share))
+                self.breakers[host] = CircuitBreaker(policy.failures, policy.cooldown)
+            return self.limiters[host], self.breakers[host]
+
+    def call(self, host, func, *args, **kwargs):
+        # Rate limit, retry and circuit-break any upstream call, e.g. a yfinance download
+        limiter, breaker = self._governors(host)
+        policy = self.policy(host)
+        for attempt in range(policy.retries + 1):
+            if not breaker.allow():
+                raise UpstreamError(f"{host} is failing; circuit open")
+            limiter.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                breaker.failure()
+                error = e
+            else:
+                breaker.success()
+                return result
+            if attempt < policy.retries:
+                metrics.record(f"http_retry_{host}")
+                time.sleep(backoff_delay(attempt, policy.backoff, policy.max_backoff))
+        raise UpstreamError(f"{host}: {error}") from error
+
+    def _fetch(self, url, params, timeout, host):
+        limiter, breaker = self._governors(host)
+        policy = self.policy(host)
+        error = None
+        for attempt in range(policy.retries + 1):
+            if not breaker.allow():
+                raise UpstreamError(f"{host} is failing; circuit open")
+            limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except requests.RequestException as e:
+                response, error = None, e
+            metrics.record(f"http_{host}", time.perf_counter() - started, nbytes=len(response.content) if response is not None else 0)
+            if response is not None and response.status_code not in RETRY_STATUS:
+                breaker.success()
+                return response
+            breaker.failure()
+            if response is not None:
+                error = UpstreamError(f"{host} returned {response.status_code}")
+            if attempt < policy.retries:
+                metrics.record(f"http_retry_{host}")
+                delay = backoff_delay(attempt, policy.backoff, policy.max_backoff)
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, min(float(retry_after), policy.max_backoff))
+                time.sleep(delay)
+        raise UpstreamError(f"{host}: {error}") from error
+
+    def get(self, url, params=None, timeout=TIMEOUT):
+        host = urlparse(url).hostname or ""
+        key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+
+        # Concurrent identical requests share the first caller's in-flight call
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+        if not leader:
+            metrics.hit("http_coalesced")
+            return future.result()
+
+        try:
+            response = self._fetch(url, params, timeout, host)
+            if response.status_code == 200:
+                with self.lock:
+                    self.stale[key] = response
+                    self.stale.move_to_end(key)
+                    while len(self.stale) > self.stale_entries:
+                        self.stale.popitem(last=False)
+        except UpstreamError as e:
+            # Serve the last good response while the host is throttling or down
+            with self.lock:
+                cached = self.stale.get(key)
+            if cached is None:
+                metrics.miss("http_stale")
+                future.set_exception(e)
+                raise
+            metrics.hit("http_stale")
+            response = copy.copy(cached)
+            response.stale = True
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+        future.set_result(response)
+        return response
+
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
+
+
+def set_client(client):
+    global _client
+    _client = client
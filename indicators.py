@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import metrics
+
+# Panel functions take DataFrames indexed by bar time with one column per ticker.
+# NaN gaps (a ticker missing a bar the others have) are skipped, so every column
+# matches what pandas_ta returns for that ticker's own series.
+
+
+def _prev_valid(panel):
+    return panel.ffill().shift(1)
+
+
+def rma(panel, length):
+    return panel.ewm(alpha=1.0 / length, min_periods=length, ignore_na=True).mean().where(panel.notna())
+
+
+def ema(panel, length, seed_sma=True):
+    if not seed_sma:
+        return panel.ewm(span=length, adjust=False, ignore_na=True).mean().where(panel.notna())
+    # pandas_ta seeds the EMA with the SMA of the first `length` values
+    valid = panel.notna()
+    counts = valid.cumsum()
+    seed = panel.fillna(0).cumsum() / length
+    seeded = panel.where(counts > length).mask(valid & (counts == length), seed)
+    return seeded.ewm(span=length, adjust=False, ignore_na=True).mean().where(valid)
+
+
+def rsi(close, length=14, mamode="rma"):
+    delta = (close - _prev_valid(close)).where(close.notna())
+    gain = delta.clip(lower=0).where(delta.notna())
+    loss = (-delta).clip(lower=0).where(delta.notna())
+    if mamode == "sma":
+        avg_gain = gain.rolling(length).mean()
+        avg_loss = loss.rolling(length).mean()
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+    avg_gain = rma(gain, length)
+    avg_loss = rma(loss, length)
+    return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def macd(close, fast=12, slow=26, signal=9, seed_sma=True):
+    line = ema(close, fast, seed_sma) - ema(close, slow, seed_sma)
+    signal_line = ema(line, signal, seed_sma)
+    return line, signal_line, line - signal_line
+
+
+def atr(high, low, close, length=14):
+    # Wilder's ATR; like pandas_ta, a ticker's first bar has no true range
+    prev = _prev_valid(close)
+    true_range = np.fmax(high - low, np.fmax((high - prev).abs(), (low - prev).abs()))
+    return rma(true_range.where(close.notna() & prev.notna()), length)
+
+
+def rvol(volume, length=10):
+    return volume / volume.rolling(length).mean()
+
+
+def build_panel(frames_by_ticker, column):
+    series = {t: df[column] for t, df in frames_by_ticker.items() if df is not None and column in df.columns}
+    if not series:
+        return pd.DataFrame()
+    return pd.DataFrame(series)
+
+
+@metrics.timed("indicators")
+def indicator_panels(close, volume=None, mamode="rma", seed_sma=True):
+    panels = {"Close": close, "RSI": rsi(close, 14, mamode)}
+    panels["MACD"], panels["Signal"], _ = macd(close, seed_sma=seed_sma)
+    if volume is not None and not volume.empty:
+        panels["RVOL"] = rvol(volume.reindex(columns=close.columns), 10)
+    return panels
+
+
+def latest_values(panels):
+    # Last bar per ticker where RSI, MACD and Signal are all defined
+    valid = panels["RSI"].notna() & panels["MACD"].notna() & panels["Signal"].notna()
+    latest = {name: panel.where(valid).ffill().iloc[-1] for name, panel in panels.items() if not panel.empty}
+    return pd.DataFrame(latest).dropna(subset=["RSI", "MACD", "Signal"])
+
+
+def score_signal(rsi_val, macd_val, signal_val, rsi_low=30, rsi_high=70):
+    score = 0
+    if rsi_val < rsi_low:
+        score += 1
+    elif rsi_val > rsi_high:
+        score -= 1
+    if macd_val > signal_val:
+        score += 1
+    elif macd_val < signal_val:
+        score -= 1
+    return score
+
+
+@metrics.timed("scoring")
+def score_latest(latest, rsi_low=30, rsi_high=70):
+    rsi_score = (latest["RSI"] < rsi_low).astype(int) - (latest["RSI"] > rsi_high).astype(int)
+    macd_score = np.sign(latest["MACD"] - latest["Signal"]).astype(int)
+    return rsi_score + macd_score
+
+
+def analyze_frame(frames_by_ticker, mamode="rma", seed_sma=True):
+    frames_by_ticker = {t: df for t, df in frames_by_ticker.items() if df is not None and not df.empty}
+    close = build_panel(frames_by_ticker, "Close")
+    if close.empty:
+        return {}, pd.DataFrame(columns=["RSI", "MACD", "Signal", "Score"])
+    panels = indicator_panels(close, build_panel(frames_by_ticker, "Volume"), mamode, seed_sma)
+
+    enriched = {}
+    for ticker, df in frames_by_ticker.items():
+        df = df.copy()
+        for name in ("RSI", "MACD", "Signal"):
+            df[name] = panels[name][ticker].reindex(df.index)
+        enriched[ticker] = df.dropna()
+
+    latest = latest_values(panels)
+    latest["Score"] = score_latest(latest)
+    return enriched, latest
@@ -0,0 +1,197 @@
+import os
+import re
+import threading
+import pandas as pd
+import yfinance as yf
+import metrics
+from http_client import UpstreamError, get_client
+from shared_cache import SharedCacheProvider
+from resampler import RULES, get_resampler, rule_for, splice
+from scheduler import INTERVAL_SECONDS
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+DOWNLOAD_HOST = "query2.finance.yahoo.com"
+# yf.download swallows per-ticker failures into yf.shared._ERRORS; these ones mean Yahoo itself is failing
+UPSTREAM_ERRORS = re.compile(r"YFRateLimitError|Too Many Requests|Rate ?limit|HTTPError|HTTP Error|ConnectionError|Timeout|\b(401|403|429|5\d\d)\b", re.I)
+
+
+@metrics.timed("flatten")
+def flatten_columns(df):
+    flat_cols = []
+    for col in df.columns:
+        if isinstance(col, tuple):
+            flat_col = "_".join([str(c) for c in col if c])
+        else:
+            flat_col = str(col)
+        flat_cols.append(flat_col)
+    df.columns = [col.split("_")[0].capitalize() for col in flat_cols]
+    return df
+
+
+def split_by_ticker(df, tickers):
+    out = {}
+    if df is None or df.empty:
+        return out
+    if not isinstance(df.columns, pd.MultiIndex):
+        if len(tickers) == 1:
+            out[tickers[0]] = flatten_columns(df.copy()).dropna(how="all")
+        return out
+    for level in range(df.columns.nlevels):
+        names = set(df.columns.get_level_values(level))
+        if any(t in names for t in tickers):
+            break
+    else:
+        return out
+    for ticker in tickers:
+        if ticker not in names:
+            continue
+        sub = df.xs(ticker, axis=1, level=level).copy()
+        sub = flatten_columns(sub).dropna(how="all")
+        if not sub.empty:
+            out[ticker] = sub
+    return out
+
+
+def align_timestamp(index, start):
+    start = pd.Timestamp(start)
+    if index.tz is not None and start.tz is None:
+        start = start.tz_localize(index.tz)
+    elif index.tz is None and start.tz is not None:
+        start = start.tz_convert(None)
+    return start
+
+
+# yf.download keeps its results and errors in process-global dicts (yf.shared) that every call resets,
+# so concurrent calls mix or drop each other's frames; downloads in this process take turns
+_download_lock = threading.Lock()
+
+
+def yahoo_download(tickers, **kwargs):
+    # Raises on throttling or HTTP failures so the client's retry and circuit breaker see them;
+    # "no data" errors for a symbol just leave it out of the result
+    with _download_lock:
+        df = yf.download(tickers, **kwargs)
+        errors = {t: yf.shared._ERRORS.get(t.upper()) for t in tickers}
+    failed = {t: e for t, e in errors.items() if e and UPSTREAM_ERRORS.search(e)}
+    if failed:
+        ticker, error = next(iter(failed.items()))
+        raise UpstreamError(f"yf.download failed for {len(failed)} of {len(tickers)} tickers, e.g. {ticker}: {error}")
+    return df
+
+
+class YahooProvider:
+    def download(self, tickers, interval, period=None, start=None):
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        kwargs = {"start": start} if start is not None else {"period": period}
+        with metrics.stage(f"download_{interval}"):
+            df = get_client().call(DOWNLOAD_HOST, yahoo_download, tickers, interval=interval, group_by="ticker", progress=False, threads=True, **kwargs)
+        metrics.add_bytes(f"download_{interval}", int(df.memory_usage(deep=False).sum()) if df is not None else 0)
+        return split_by_ticker(df, tickers)
+
+
+class FixtureProvider:
+    # Serves recorded bars from <root>/<TICKER>_<interval>.csv and logs every request
+    def __init__(self, root):
+        self.root = root
+        self.calls = []
+
+    def download(self, tickers, interval, period=None, start=None):
+        tickers = list(tickers)
+        self.calls.append((tuple(tickers), interval, period, start))
+        out = {}
+        for ticker in tickers:
+            path = os.path.join(self.root, f"{ticker}_{interval}.csv")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            if start is not None and not df.empty:
+                df = df[df.index >= align_timestamp(df.index, start)]
+            out[ticker] = flatten_columns(df)
+        return out
+
+
+_provider = None
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        fixtures = os.environ.get("MARKET_DATA_FIXTURES")
+        if fixtures:
+            _provider = FixtureProvider(fixtures)
+        elif os.environ.get("SHARED_CACHE", "1") == "0":
+            _provider = YahooProvider()
+        else:
+            # Dashboards, scans and the service on one box share each download instead of repeating it
+            _provider = SharedCacheProvider(YahooProvider())
+    return _provider
+
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
+
+
+def finer_source(interval, intervals):
+    # The finest other intraday interval that evenly divides this one, if any
+    step = INTERVAL_SECONDS.get(interval)
+    if step is None or step >= INTERVAL_SECONDS["1d"]:
+        return None
+    finer = [i for i in intervals if INTERVAL_SECONDS.get(i, step) < step and step % INTERVAL_SECONDS[i] == 0]
+    return min(finer, key=INTERVAL_SECONDS.get) if finer else None
+
+
+def fetch_frames(tickers, frames, provider=None, store=None, refresh=True, resampler=None):
+    provider = provider or get_provider()
+    resampler = resampler or get_resampler()
+    tickers = list(dict.fromkeys(tickers))
+    data = {ticker: {} for ticker in tickers}
+    if not tickers:
+        return data
+
+    # One grouped download per distinct (interval, period), shared by every frame that needs it.
+    # Any other timeframe is aggregated locally from its group's bars, so it costs no download.
+    groups = {}
+    for tf, params in frames.items():
+        groups.setdefault((params["interval"], params["period"]), []).append(tf)
+
+    bars = {}
+    for interval, period in groups:
+        if store is not None:
+            bars[(interval, period)] = store.load(tickers, interval, period, provider, refresh=refresh)
+        else:
+            bars[(interval, period)] = provider.download(tickers, interval, period=period)
+
+    # Coarser intraday bars are rebuilt from the finest download where the two overlap,
+    # so e.g. the forming 5m bar follows the latest 1m bar instead of the last 5m refresh
+    sources = {}
+    for group in groups:
+        finer = finer_source(group[0], [interval for interval, _ in groups])
+        if finer is not None:
+            sources[group] = next(g for g in groups if g[0] == finer)
+
+    for ticker in tickers:
+        base = {}
+        for group in groups:
+            df = bars[group].get(ticker)
+            fine = bars[sources[group]].get(ticker) if group in sources else None
+            rule = RULES.get(group[0])
+            if rule and df is not None and not df.empty and fine is not None and not fine.empty:
+                rebuilt = resampler.get((ticker,) + sources[group] + rule, fine, *rule)
+                df = splice(df, rebuilt, fine.index[0])
+            base[group] = df
+
+        for group, tfs in groups.items():
+            df = base[group]
+            for tf in tfs:
+                if df is None or df.empty:
+                    data[ticker][tf] = pd.DataFrame()
+                    continue
+                rule = rule_for(tf, frames[tf])
+                if rule is None:
+                    data[ticker][tf] = df.copy()
+                else:
+                    data[ticker][tf] = resampler.get((ticker,) + group + rule, df, *rule)
+    return data
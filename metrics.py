@@ -0,0 +1,141 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+import pandas as pd
+
+FIELDS = ("calls", "seconds", "bytes", "hits", "misses")
+
+
+class Stage:
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+_stages = {}
+_lock = threading.Lock()
+
+
+def _stage(name):
+    stage = _stages.get(name)
+    if stage is None:
+        with _lock:
+            stage = _stages.setdefault(name, Stage())
+    return stage
+
+
+def record(name, seconds=0.0, calls=1, nbytes=0):
+    stage = _stage(name)
+    with _lock:
+        stage.calls += calls
+        stage.seconds += seconds
+        stage.bytes += nbytes
+
+
+def add_bytes(name, nbytes):
+    stage = _stage(name)
+    with _lock:
+        stage.bytes += nbytes
+
+
+def hit(name, count=1):
+    stage = _stage(name)
+    with _lock:
+        stage.hits += count
+
+
+def miss(name, count=1):
+    stage = _stage(name)
+    with _lock:
+        stage.misses += count
+
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        return {name: {field: getattr(s, field) for field in FIELDS} for name, s in sorted(_stages.items())}
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def to_frame():
+    df = pd.DataFrame.from_dict(snapshot(), orient="index", columns=list(FIELDS))
+    if df.empty:
+        return df
+    df["avg ms"] = (df["seconds"] / df["calls"].where(df["calls"] > 0) * 1000).round(2)
+    lookups = df["hits"] + df["misses"]
+    df["hit %"] = (df["hits"] / lookups.where(lookups > 0) * 100).round(1)
+    return df.sort_values("seconds", ascending=False)
+
+
+def to_prometheus(prefix="trading_assistant"):
+    metrics = {
+        "calls": ("stage_calls_total", "counter", "Calls per pipeline stage"),
+        "seconds": ("stage_seconds_total", "counter", "Wall time spent per pipeline stage"),
+        "bytes": ("stage_bytes_total", "counter", "Bytes fetched per pipeline stage"),
+        "hits": ("cache_hits_total", "counter", "Cache hits per pipeline stage"),
+        "misses": ("cache_misses_total", "counter", "Cache misses per pipeline stage"),
+    }
+    stages = snapshot()
+    lines = []
+    for field, (name, kind, help_text) in metrics.items():
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for stage_name, values in stages.items():
+            lines.append(f'{prefix}_{name}{{stage="{stage_name}"}} {values[field]}')
+    return "\n".join(lines) + "\n"
+
+
+def to_jsonl():
+    now = time.time()
+    return "".join(json.dumps({"time": now, "stage": name, **values}) + "\n" for name, values in snapshot().items())
+
+
+def export(path):
+    # .prom files are rewritten for a Prometheus textfile collector; anything else gets JSON lines appended
+    if path.endswith(".prom"):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(to_prometheus())
+        os.replace(tmp, path)
+    else:
+        with open(path, "a") as f:
+            f.write(to_jsonl())
+
+
+# Headless scripts export their counters on exit with METRICS_OUT=run.prom or METRICS_OUT=run.jsonl
+if os.environ.get("METRICS_OUT"):
+    atexit.register(export, os.environ["METRICS_OUT"])
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from gappers import MAX_WORKERS, TIMEOUT
+from http_client import UpstreamError, get_client
+
+NEWS_URL = "https://query1.finance.yahoo.com/v1/finance/search"
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".trading_assistant", "sentiment.json")
+HEADLINES = 5
+# Scored headlines older than this are dropped when the memo is saved
+RETENTION = 7 * 24 * 3600
+# "seen" is only refreshed once it is this old, so re-reading known headlines doesn't rewrite the file
+SEEN_RESOLUTION = 3600
+
+
+def article_id(item):
+    return item.get("uuid") or item.get("link") or item.get("title")
+
+
+def sentiment_label(polarity):
+    if polarity is None:
+        return "⚪ Neutral"
+    if polarity > 0.15:
+        return "🟢 Bullish"
+    elif polarity < -0.15:
+        return "🔴 Bearish"
+    return "⚪ Neutral"
+
+
+class SentimentMemo:
+    # Polarity per article id, persisted so a headline is scored once no matter how often it's shown
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("SENTIMENT_CACHE", DEFAULT_PATH)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        with self.lock:
+            cutoff = time.time() - RETENTION
+            stale = [key for key, entry in self.entries.items() if entry["seen"] < cutoff]
+            for key in stale:
+                del self.entries[key]
+            if not self.dirty and not stale:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def score(self, articles):
+        # articles: {id: title}; only ids that were never scored reach TextBlob
+        now = time.time()
+        with self.lock:
+            missing = {key: title for key, title in articles.items() if key not in self.entries}
+        metrics.hit("sentiment", len(articles) - len(missing))
+        metrics.miss("sentiment", len(missing))
+        scored = {}
+        if missing:
+            # textblob (and nltk under it) is only imported once there is something to score
+            from textblob import TextBlob
+            with metrics.stage("sentiment"):
+                scored = {key: TextBlob(title).sentiment.polarity for key, title in missing.items()}
+        with self.lock:
+            for key, polarity in scored.items():
+                self.entries[key] = {"polarity": polarity, "seen": now}
+            for key in articles:
+                if now - self.entries[key]["seen"] >= SEEN_RESOLUTION:
+                    self.entries[key]["seen"] = now
+                    self.dirty = True
+            if scored:
+                self.dirty = True
+            return {key: self.entries[key]["polarity"] for key in articles}
+
+
+_memo = None
+
+
+def get_memo():
+    global _memo
+    if _memo is None:
+        _memo = SentimentMemo()
+    return _memo
+
+
+def fetch_headlines(symbol, session, timeout=TIMEOUT, limit=HEADLINES):
+    # Returns (items, stale); raises UpstreamError when Yahoo is throttling or down, so that isn't
+    # mistaken for a ticker without news
+    with metrics.stage("news"):
+        response = session.get(NEWS_URL, params={"q": symbol}, timeout=timeout)
+    metrics.add_bytes("news", len(response.content))
+    if response.status_code != 200:
+        raise UpstreamError(f"news search for {symbol} returned {response.status_code}")
+    try:
+        items = response.json().get("news", [])[:limit]
+    except (AttributeError, TypeError, ValueError):
+        items = []
+    return items, getattr(response, "stale", False)
+
+
+def fetch_or_fail(symbol, session, timeout):
+    try:
+        return fetch_headlines(symbol, session, timeout) + (None,)
+    except UpstreamError as e:
+        metrics.miss("news")
+        return [], False, str(e)
+
+
+def load_news(symbols, session=None, max_workers=MAX_WORKERS, timeout=TIMEOUT, memo=None):
+    # {symbol: {"items": [...], "score": mean polarity or None, "sentiment": label, "stale": bool, "error": str or None}};
+    # error is set when the headlines couldn't be fetched, stale when they are the last good response
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    session = session or get_client()
+    memo = memo or get_memo()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fetched = dict(zip(symbols, pool.map(lambda s: fetch_or_fail(s, session, timeout), symbols)))
+    headlines = {symbol: items for symbol, (items, _, _) in fetched.items()}
+
+    # The same story often shows up under several tickers; it's scored once
+    articles = {}
+    for items in headlines.values():
+        for item in items:
+            key = article_id(item)
+            if key and item.get("title"):
+                articles.setdefault(key, item["title"])
+    polarity = memo.score(articles)
+    memo.save()
+
+    out = {}
+    for symbol, items in headlines.items():
+        rows = []
+        for item in items:
+            key = article_id(item)
+            if key not in polarity:
+                continue
+            rows.append({"title": item["title"], "link": item.get("link", ""), "polarity": polarity[key], "sentiment": sentiment_label(polarity[key])})
+        score = sum(row["polarity"] for row in rows) / len(rows) if rows else None
+        _, stale, error = fetched[symbol]
+        out[symbol] = {"items": rows, "score": score, "sentiment": sentiment_label(score), "stale": stale, "error": error}
+    return out
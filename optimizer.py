@@ -0,0 +1,96 @@
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from backtest import load_history, precompute, signals_from, simulate, summarize
+from signal_engine import FRAMES
+
+# Candidate values per parameter; the full grid is every combination
+GRID = {
+    "w_1m": [0.2, 0.35, 0.5],
+    "w_5m": [0.15, 0.30, 0.45],
+    "w_10m": [0.1, 0.20, 0.3],
+    "w_1d": [0.05, 0.15, 0.25],
+    "rsi_low": [25, 30, 35],
+    "rsi_high": [65, 70, 75],
+    "rvol": [1.2, 1.5, 2.0],
+    "min_confidence": [None, 0, 25],
+}
+
+_precomputed = None
+
+
+def _init_worker(precomputed):
+    global _precomputed
+    _precomputed = precomputed
+
+
+def evaluate(params, precomputed=None):
+    precomputed = precomputed if precomputed is not None else _precomputed
+    weights = {tf: params[f"w_{tf}"] for tf in FRAMES if f"w_{tf}" in params}
+    trades = []
+    for pre in precomputed.values():
+        sig = signals_from(pre, weights, params["rsi_low"], params["rsi_high"])
+        result = simulate(sig, rsi_entry=(params["rsi_low"], 60), rvol_entry=params["rvol"], rsi_exit=params["rsi_high"], min_confidence=params["min_confidence"])
+        if not result.empty:
+            trades.append(result)
+    stats = summarize(pd.concat(trades, ignore_index=True) if trades else pd.DataFrame())
+    return {**params, **stats}
+
+
+def _evaluate_chunk(chunk):
+    return [evaluate(params) for params in chunk]
+
+
+def combinations(grid=GRID, samples=None, seed=None):
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+
+def sweep(tickers, combos, workers=None, chunk_size=50, store=None):
+    # Indicators are computed once per symbol here and shared with every worker
+    history = load_history(tickers, FRAMES, store)
+    precomputed = {t: precompute(history[t], FRAMES) for t in tickers}
+    precomputed = {t: pre for t, pre in precomputed.items() if pre is not None}
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(precomputed,)) as pool:
+        for result in pool.map(_evaluate_chunk, chunks):
+            rows.extend(result)
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep signal weights and thresholds over stored history")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--random", type=int, help="evaluate N random grid points instead of the full grid")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--sort", default="total_return", help="report column to rank by")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="write the full report to CSV")
+    args = parser.parse_args()
+
+    combos = combinations(GRID, args.random, args.seed)
+    started = time.perf_counter()
+    report = sweep([t.upper() for t in args.tickers], combos, args.workers)
+    elapsed = time.perf_counter() - started
+
+    if args.sort in report.columns:
+        report = report.sort_values(args.sort, ascending=False, na_position="last")
+    if args.out:
+        report.to_csv(args.out, index=False)
+        print(f"💾 Wrote {len(report)} rows to {args.out}")
+    print("\n📊 Top Parameter Sets:\n")
+    print(report.head(args.top).to_string(index=False))
+    print(f"\n⏱️ Evaluated {len(combos)} combinations in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+import metrics
+
+# Timeframes that can be built locally from finer bars: (pandas rule, bucket offset).
+# Hourly bars start at the 9:30 open like Yahoo's, so they are offset by 30 minutes.
+RULES = {
+    "2m": ("2min", None),
+    "3m": ("3min", None),
+    "5m": ("5min", None),
+    "10m": ("10min", None),
+    "15m": ("15min", None),
+    "30m": ("30min", None),
+    "1h": ("60min", "30min"),
+    "60m": ("60min", "30min"),
+}
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+# Aggregates kept by the resampler; the least recently used are dropped past this
+MAX_ENTRIES = 4096
+
+
+def resample_ohlcv(df, rule, offset=None):
+    agg = {col: how for col, how in AGG.items() if col in df.columns}
+    if not agg:
+        return pd.DataFrame()
+    return df.resample(rule, offset=offset).agg(agg).dropna()
+
+
+def rule_for(tf, params=None):
+    params = params or {}
+    if params.get("resample"):
+        return params["resample"], params.get("offset")
+    if tf in RULES and tf != params.get("interval"):
+        return RULES[tf]
+    return None
+
+
+def splice(coarse, rebuilt, fine_start):
+    # Replaces the coarse bars from fine_start on with bars rebuilt from the finer series
+    if rebuilt is None or rebuilt.empty:
+        return coarse
+    # The first rebuilt bucket may only be partly covered by the fine bars, so its coarse bar is kept
+    if rebuilt.index[0] < fine_start:
+        rebuilt = rebuilt.iloc[1:]
+        if rebuilt.empty:
+            return coarse
+    return pd.concat([coarse[coarse.index < rebuilt.index[0]], rebuilt])
+
+
+class Resampler:
+    # Caches each aggregate; when base bars are appended only the last (partial) bucket onwards is rebuilt
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.cache = OrderedDict()
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+    @metrics.timed("resample")
+    def get(self, key, base, rule, offset=None):
+        if base is None or base.empty:
+            return pd.DataFrame()
+        with self.lock:
+            cached = self.cache.get(key)
+        if cached is not None:
+            agg, first_ts, last_ts = cached
+            if base.index[0] == first_ts and base.index[-1] >= last_ts and not agg.empty:
+                metrics.hit("resample")
+                last_bucket = agg.index[-1]
+                tail = resample_ohlcv(base[base.index >= last_bucket], rule, offset)
+                agg = pd.concat([agg[agg.index < last_bucket], tail])
+            else:
+                agg = None
+        else:
+            agg = None
+        if agg is None:
+            metrics.miss("resample")
+            agg = resample_ohlcv(base, rule, offset)
+        with self.lock:
+            self.cache[key] = (agg, base.index[0], base.index[-1])
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        return agg.copy()
+
+
+_resampler = Resampler()
+
+
+def get_resampler():
+    return _resampler
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import requests
+import metrics
+from indicators import atr, build_panel
+from market_data import fetch_frames
+from signal_engine import FRAMES as SIGNAL_FRAMES, service_url
+
+# Same downloads the signal engine already makes, so sizing costs no extra fetch
+FRAMES = {tf: SIGNAL_FRAMES[tf] for tf in ("1d", "5m")}
+ATR_LENGTH = 14
+# The stop sits at the wider of these ATR multiples, so noise on either timeframe doesn't trip it
+STOP_ATR = {"1d": 0.5, "5m": 2.0}
+RISK_PER_TRADE = 0.01
+MAX_POSITION = 0.20
+MAX_GROSS = 1.0
+# Full risk budget from this RVOL up; thinner names get proportionally less, down to RVOL_FLOOR of it
+RVOL_FULL = 1.5
+RVOL_FLOOR = 0.25
+# Correlation above the floor counts as overlap: k names moving as one share a single bet's risk
+CORR_FLOOR = 0.3
+MIN_BARS = 30
+COLUMNS = ["Price", "Confidence", "RVOL", "ATR 1d", "ATR 5m", "Stop", "Stop %", "Crowding", "Shares", "Exposure", "Risk $"]
+
+
+def latest(panel, tickers):
+    if panel.empty:
+        return np.full(len(tickers), np.nan)
+    return panel.reindex(columns=tickers).ffill().iloc[-1].to_numpy(dtype="float64")
+
+
+def crowding(returns, floor=CORR_FLOOR, min_periods=MIN_BARS):
+    # Effective number of candidates each one moves with, itself included; pairs with too little
+    # shared history count as independent
+    corr = returns.corr(min_periods=min_periods)
+    overlap = np.clip((np.nan_to_num(corr.to_numpy()) - floor) / (1 - floor), 0, 1)
+    np.fill_diagonal(overlap, 1)
+    return corr, overlap.sum(axis=1)
+
+
+@metrics.timed("risk")
+def size_positions(results, frames_by_ticker, capital):
+    # results: {ticker: evaluate() result}; frames_by_ticker: {ticker: {"1d": df, "5m": df}}.
+    # Every candidate with a positive confidence is sized at once; attrs["corr"] holds the
+    # return correlations the crowding adjustment used.
+    tickers = [t for t, r in results.items() if (r.get("confidence") or 0) > 0]
+    if not tickers or capital <= 0:
+        return pd.DataFrame(columns=COLUMNS)
+
+    atrs, closes = {}, {}
+    for tf in STOP_ATR:
+        frames = {t: (frames_by_ticker.get(t) or {}).get(tf) for t in tickers}
+        high, low, close = (build_panel(frames, col) for col in ("High", "Low", "Close"))
+        closes[tf] = close
+        atrs[tf] = latest(atr(high, low, close, ATR_LENGTH), tickers) if not close.empty else np.full(len(tickers), np.nan)
+
+    price = latest(closes["5m"], tickers)
+    price = np.where(np.isnan(price), latest(closes["1d"], tickers), price)
+    # fmax skips a missing timeframe; a NaN stop means no bars at all and the name gets no size
+    stop = np.fmax(STOP_ATR["1d"] * atrs["1d"], STOP_ATR["5m"] * atrs["5m"])
+
+    conf = np.array([results[t]["confidence"] for t in tickers], dtype="float64")
+    rvol = np.array([results[t].get("rvol") for t in tickers], dtype="float64")
+    rvol_factor = np.clip(np.nan_to_num(rvol / RVOL_FULL, nan=RVOL_FLOOR), RVOL_FLOOR, 1.0)
+
+    if closes["5m"].empty:
+        corr, crowd = pd.DataFrame(index=tickers, columns=tickers, dtype="float64"), np.ones(len(tickers))
+    else:
+        returns = closes["5m"].reindex(columns=tickers).pct_change(fill_method=None)
+        corr, crowd = crowding(returns)
+
+    budget = capital * RISK_PER_TRADE * (conf / 100) * rvol_factor / crowd
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exposure = np.where(stop > 0, budget / stop * price, 0.0)
+        exposure = np.minimum(np.nan_to_num(exposure), capital * MAX_POSITION)
+        gross = exposure.sum()
+        if gross > capital * MAX_GROSS:
+            exposure *= capital * MAX_GROSS / gross
+        shares = np.nan_to_num(np.floor(exposure / price))
+
+    plan = pd.DataFrame({
+        "Price": price.round(2),
+        "Confidence": conf.round(1),
+        "RVOL": rvol.round(2),
+        "ATR 1d": atrs["1d"].round(3),
+        "ATR 5m": atrs["5m"].round(3),
+        "Stop": (price - stop).round(2),
+        "Stop %": (100 * stop / price).round(2),
+        "Crowding": crowd.round(2),
+        "Shares": shares.astype("int64"),
+        "Exposure": (shares * np.nan_to_num(price)).round(2),
+        "Risk $": (shares * np.nan_to_num(stop)).round(2),
+    }, index=pd.Index(tickers, name="Symbol"))
+    plan = plan.sort_values("Exposure", ascending=False)
+    plan.attrs["corr"] = corr
+    return plan
+
+
+def plan_positions(results, capital, store=None, provider=None, refresh=True):
+    candidates = [t for t, r in results.items() if (r.get("confidence") or 0) > 0]
+    frames = fetch_frames(candidates, FRAMES, provider=provider, store=store, refresh=refresh) if candidates else {}
+    return size_positions(results, frames, capital)
+
+
+def load_plan(results, capital, store=None, refresh=True, timeout=30):
+    # Like load_signals: with SIGNAL_SERVICE_URL set the signals came from the service, and so must the
+    # bars they were scored on, so the service sizes them from its own store
+    url = service_url()
+    if not url:
+        return plan_positions(results, capital, store=store, refresh=refresh)
+    if capital <= 0:
+        return pd.DataFrame(columns=COLUMNS)
+    response = requests.get(f"{url}/risk", params={"capital": capital, "tickers": ",".join(results)}, timeout=timeout)
+    response.raise_for_status()
+    positions = response.json()["positions"]
+    if not positions:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.DataFrame(positions).set_index("Symbol")[COLUMNS]
@@ -1,77 +1,121 @@
-import yfinance as yf
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import pandas as pd
+from bar_store import get_store
+from http_client import HttpClient, set_client
+from indicators import analyze_frame, score_latest
+from universe import read_universe
 
 # 🔹 Step 1: Define your watchlist — change this anytime
 tickers = ["AAPL", "MSFT", "TSLA", "NVDA", "GOOGL", "AMZN"]
 
-# 🔹 Step 2: Set up a results list
-results = []
-
-for ticker in tickers:
-    try:
-        df = yf.download(ticker, period="120d", interval="1d", progress=False)
-
-        # Calculate RSI
-        delta = df["Close"].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.rolling(14).mean()
-        avg_loss = loss.rolling(14).mean()
-        rs = avg_gain / avg_loss
-        df["RSI"] = 100 - (100 / (1 + rs))
-
-        # Calculate MACD
-        ema12 = df["Close"].ewm(span=12, adjust=False).mean()
-        ema26 = df["Close"].ewm(span=26, adjust=False).mean()
-        df["MACD"] = ema12 - ema26
-        df["Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
-
-        df.dropna(inplace=True)
-        if df.empty:
-            continue
-
-        # Get the latest values
-        rsi_val = df["RSI"].iloc[-1].item()
-        macd_val = df["MACD"].iloc[-1].item()
-        signal_val = df["Signal"].iloc[-1].item()
-
-        # Signal logic
-        score = 0
-        if rsi_val < 30:
-            score += 1
-        elif rsi_val > 70:
-            score -= 1
-        if macd_val > signal_val:
-            score += 1
-        elif macd_val < signal_val:
-            score -= 1
-
-        if score >= 2:
-            suggestion = "STRONG BUY ✅"
-        elif score == 1:
-            suggestion = "BUY 🔼"
-        elif score == 0:
-            suggestion = "NEUTRAL ⚖️"
-        elif score == -1:
-            suggestion = "SELL 🔽"
-        else:
-            suggestion = "STRONG SELL ❌"
-
-        results.append({
-            "Ticker": ticker,
-            "RSI": round(rsi_val, 2),
-            "MACD": round(macd_val, 2),
-            "Signal": round(signal_val, 2),
-            "Score": score,
-            "Suggestion": suggestion
-        })
-
-    except Exception as e:
-        print(f"Error with {ticker}: {e}")
-
-# 🔹 Step 3: Display results sorted by strongest signals
-df_results = pd.DataFrame(results)
-df_results.sort_values("Score", ascending=False, inplace=True)
-
-print("\n📊 Signal Results:\n")
-print(df_results.to_string(index=False))
\ No newline at end of file
+SUGGESTIONS = {2: "STRONG BUY ✅", 1: "BUY 🔼", 0: "NEUTRAL ⚖️", -1: "SELL 🔽", -2: "STRONG SELL ❌"}
+
+
+def score_symbols(symbols, period="120d"):
+    # Warm reads from the local bar store; only bars after the last stored one are downloaded
+    bars = get_store().load(symbols, "1d", period)
+
+    # Simple-average RSI and unseeded EMAs, computed for every symbol in one pass
+    _, latest = analyze_frame(bars, mamode="sma", seed_sma=False)
+    if latest.empty:
+        return pd.DataFrame(columns=["Ticker", "RSI", "MACD", "Signal", "Score", "Suggestion"])
+
+    scores = score_latest(latest)
+    return pd.DataFrame({
+        "Ticker": latest.index,
+        "RSI": latest["RSI"].round(2).to_numpy(),
+        "MACD": latest["MACD"].round(2).to_numpy(),
+        "Signal": latest["Signal"].round(2).to_numpy(),
+        "Score": scores.to_numpy(),
+        "Suggestion": scores.map(SUGGESTIONS).to_numpy(),
+    })
+
+
+def init_worker(workers):
+    # Each worker process gets its own client; splitting the per-host budget keeps the pool within it
+    set_client(HttpClient(share=workers))
+
+
+def scan(symbols, workers=None, chunk_size=100, time_budget=None, period="120d"):
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    deadline = time.monotonic() + time_budget if time_budget else None
+    frames = []
+    workers = min(workers or os.cpu_count() or 1, len(chunks)) or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(workers,)) as pool:
+        pending = {pool.submit(score_symbols, chunk, period) for chunk in chunks}
+        while pending:
+            timeout = max(deadline - time.monotonic(), 0) if deadline else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    frames.append(future.result())
+                except Exception as e:
+                    print(f"Chunk failed: {e}")
+            if deadline and time.monotonic() >= deadline and pending:
+                print(f"⏱️ Time budget reached, skipping {len(pending)} of {len(chunks)} chunks")
+                for future in pending:
+                    future.cancel()
+                break
+    frames = [df for df in frames if not df.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def rank(results, top=None, min_score=None):
+    if results.empty:
+        return results
+    if min_score is not None:
+        results = results[results["Score"] >= min_score]
+    # Strongest score first; within a score, the widest MACD lead over its signal line
+    results = results.assign(_edge=results["MACD"] - results["Signal"])
+    results = results.sort_values(["Score", "_edge"], ascending=False).drop(columns="_edge")
+    return results.head(top) if top else results
+
+
+def write_results(results, path):
+    if path.endswith(".parquet"):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSI/MACD signal scan")
+    parser.add_argument("--universe", help="symbol file (one per line, or CSV with a Symbol column)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--top", type=int, help="keep only the top K ranked symbols")
+    parser.add_argument("--min-score", type=int, help="drop symbols scoring below this")
+    parser.add_argument("--time-budget", type=float, help="seconds before remaining chunks are skipped")
+    parser.add_argument("--period", default="120d")
+    parser.add_argument("--out", help="write ranked results to .csv or .parquet")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.universe:
+        # 🔹 Step 2: Shard the universe across a process pool
+        symbols = read_universe(args.universe)
+        results = scan(symbols, args.workers, args.chunk_size, args.time_budget, args.period)
+    else:
+        symbols = tickers
+        results = score_symbols(tickers, args.period)
+        for ticker in tickers:
+            if results.empty or ticker not in results["Ticker"].values:
+                print(f"Error with {ticker}: no data")
+    elapsed = time.perf_counter() - started
+
+    # 🔹 Step 3: Display results sorted by strongest signals
+    df_results = rank(results, args.top, args.min_score)
+    if args.out:
+        write_results(df_results, args.out)
+        print(f"💾 Wrote {len(df_results)} rows to {args.out}")
+
+    print("\n📊 Signal Results:\n")
+    print(df_results.head(50).to_string(index=False))
+    print(f"\n⏱️ Scanned {len(results)}/{len(symbols)} symbols in {elapsed:.2f}s ({len(symbols) / max(elapsed, 1e-9):.0f} symbols/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from fundamentals import next_rollover
+from http_client import UpstreamError
+
+SCREENER_URL = "https://query1.finance.yahoo.com/v1/finance/screener/predefined/saved"
+# Yahoo's predefined screeners merged into one list; before the open their quotes carry pre-market prices
+SCREENERS = ["day_gainers", "most_actives", "small_cap_gainers"]
+PAGE_SIZE = 100
+MAX_RESULTS = 300
+TIMEOUT = 10
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".trading_assistant", "screeners")
+
+
+def fetch_page(session, scr_id, start=0, count=PAGE_SIZE, timeout=TIMEOUT):
+    # Returns (quotes, total, stale)
+    response = session.get(SCREENER_URL, params={"scrIds": scr_id, "start": start, "count": count}, timeout=timeout)
+    metrics.add_bytes("screener", len(response.content))
+    if response.status_code != 200:
+        raise UpstreamError(f"{scr_id} screener returned {response.status_code}")
+    try:
+        result = response.json()["finance"]["result"][0]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise UpstreamError(f"{scr_id} screener: unexpected response") from e
+    return result["quotes"], result.get("total", len(result["quotes"])), getattr(response, "stale", False)
+
+
+@metrics.timed("screener")
+def fetch_screeners(session, screeners=SCREENERS, max_results=MAX_RESULTS, max_workers=4, timeout=TIMEOUT):
+    # Returns ({scr_id: quotes}, stale, failed). First pages go out together; their totals decide
+    # which further pages each screener needs, and those go out together too.
+    pages, failed, stale = {}, set(), False
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        first = {scr_id: pool.submit(fetch_page, session, scr_id, 0, min(PAGE_SIZE, max_results), timeout) for scr_id in screeners}
+        rest = []
+        for scr_id, future in first.items():
+            try:
+                quotes, total, page_stale = future.result()
+            except UpstreamError:
+                failed.add(scr_id)
+                continue
+            pages[scr_id] = [quotes]
+            stale = stale or page_stale
+            for start in range(PAGE_SIZE, min(total, max_results), PAGE_SIZE):
+                count = min(PAGE_SIZE, max_results - start)
+                rest.append((scr_id, pool.submit(fetch_page, session, scr_id, start, count, timeout)))
+        for scr_id, future in rest:
+            try:
+                quotes, _, page_stale = future.result()
+            except UpstreamError:
+                failed.add(scr_id)
+                continue
+            pages[scr_id].append(quotes)
+            stale = stale or page_stale
+    if not pages:
+        raise UpstreamError("every screener request failed")
+    for scr_id in failed:
+        metrics.miss(f"screener_{scr_id}")
+    return {scr_id: [quote for page in scr_pages for quote in page] for scr_id, scr_pages in pages.items()}, stale, failed
+
+
+def merge(results):
+    # Dedupes by symbol, keeping the first screener's quote; returns (quotes, {symbol: [scr_id, ...]})
+    quotes, screens = [], {}
+    for scr_id, scr_quotes in results.items():
+        for quote in scr_quotes:
+            symbol = quote.get("symbol")
+            if not symbol:
+                continue
+            if symbol not in screens:
+                screens[symbol] = []
+                quotes.append(quote)
+            if scr_id not in screens[symbol]:
+                screens[symbol].append(scr_id)
+    return quotes, screens
+
+
+class Snapshot:
+    # The last scan's ranked rows, enrichment included, so a refresh can diff against it and only enrich new names.
+    # Enrichment (float, short interest) expires at the same premarket rollover as the fundamentals cache.
+    def __init__(self, name="gappers", root=None):
+        root = root or os.environ.get("SCREENER_SNAPSHOT_DIR", DEFAULT_DIR)
+        self.path = os.path.join(root, f"{name}.json")
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.ranks = {}
+        self.taken = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.taken = data["taken"]
+        self.ranks = data["ranks"]
+        if next_rollover(self.taken) > time.time():
+            self.rows = {row["Symbol"]: row for row in data["rows"]}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"taken": self.taken, "ranks": self.ranks, "rows": list(self.rows.values())}, f)
+        os.replace(tmp, self.path)
+
+    def diff(self, symbols):
+        # symbols in rank order; moved holds places gained (positive) or lost (negative)
+        ranks = {symbol: rank for rank, symbol in enumerate(symbols, 1)}
+        return {
+            "new": [s for s in symbols if s not in self.ranks],
+            "dropped": [s for s in self.ranks if s not in ranks],
+            "moved": {s: self.ranks[s] - ranks[s] for s in symbols if s in self.ranks and self.ranks[s] != ranks[s]},
+        }
+
+    def update(self, rows):
+        # rows in rank order; returns the diff against the previous snapshot
+        symbols = [row["Symbol"] for row in rows]
+        with self.lock:
+            diff = self.diff(symbols)
+            self.ranks = {symbol: rank for rank, symbol in enumerate(symbols, 1)}
+            self.rows = {row["Symbol"]: row for row in rows}
+            self.taken = time.time()
+            self.save()
+        return diff
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(name="gappers"):
+    with _snapshots_lock:
+        if name not in _snapshots:
+            _snapshots[name] = Snapshot(name)
+        return _snapshots[name]
+
+
+def set_snapshot(snapshot, name="gappers"):
+    with _snapshots_lock:
+        _snapshots[name] = snapshot
@@ -0,0 +1,111 @@
+import heapq
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = (9, 30)
+SESSION_CLOSE = (16, 0)
+INTERVAL_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400, "1h": 3600, "1d": 86400}
+
+
+def _session(day):
+    start = day.replace(hour=SESSION_OPEN[0], minute=SESSION_OPEN[1], second=0, microsecond=0)
+    end = day.replace(hour=SESSION_CLOSE[0], minute=SESSION_CLOSE[1], second=0, microsecond=0)
+    return start, end
+
+
+def _next_weekday(day):
+    day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def is_market_open(now=None):
+    now = datetime.fromtimestamp(now or time.time(), MARKET_TZ)
+    start, end = _session(now)
+    return now.weekday() < 5 and start <= now < end
+
+
+def next_bar_close(interval, now=None):
+    # Weekends are skipped; exchange holidays are not, which only costs an empty fetch
+    now = datetime.fromtimestamp(now or time.time(), MARKET_TZ)
+    day = now if now.weekday() < 5 else _next_weekday(now)
+    start, end = _session(day)
+    if interval == "1d":
+        if day.date() == now.date() and now >= end:
+            end = _session(_next_weekday(now))[1]
+        return end.timestamp()
+
+    step = INTERVAL_SECONDS[interval]
+    if day.date() != now.date() or now < start:
+        return (start + timedelta(seconds=step)).timestamp()
+    if now >= end:
+        return (_session(_next_weekday(now))[0] + timedelta(seconds=step)).timestamp()
+    bars = int((now - start).total_seconds() // step) + 1
+    return min(start + timedelta(seconds=bars * step), end).timestamp()
+
+
+class RateLimiter:
+    # Token bucket: at most `per_minute` acquisitions per minute, with bursts up to `burst`
+    def __init__(self, per_minute=30, burst=5):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RefreshScheduler:
+    # Calls refresh(interval, period) a few seconds after each bar of that interval closes
+    def __init__(self, frames, refresh, jitter=(1.0, 5.0), limiter=None):
+        self.refresh = refresh
+        self.jitter = jitter
+        self.limiter = limiter or RateLimiter()
+        self.jobs = sorted({(params["interval"], params["period"]) for params in frames.values()})
+        self.stop_event = threading.Event()
+
+    def schedule(self, now=None):
+        now = now or time.time()
+        queue = [(next_bar_close(interval, now) + random.uniform(*self.jitter), interval, period) for interval, period in self.jobs]
+        heapq.heapify(queue)
+        return queue
+
+    def run(self):
+        queue = self.schedule()
+        while not self.stop_event.is_set() and queue:
+            due, interval, period = queue[0]
+            if self.stop_event.wait(max(due - time.time(), 0)):
+                break
+            heapq.heappop(queue)
+            self.limiter.acquire()
+            try:
+                self.refresh(interval, period)
+            except Exception as e:
+                print(f"Refresh {interval}/{period} failed: {e}")
+            # Schedule from the bar that just closed so a slow refresh never skips ahead
+            next_due = next_bar_close(interval, max(due, time.time()))
+            heapq.heappush(queue, (next_due + random.uniform(*self.jitter), interval, period))
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="refresh-scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,228 @@
+import io
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+import metrics
+from scheduler import INTERVAL_SECONDS, next_bar_close
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".trading_assistant", "shared_cache.sqlite")
+# Seconds a download stays fresh; about one bar for intraday, since the forming bar keeps changing
+TTL = {"1m": 30, "2m": 60, "5m": 60, "15m": 120, "30m": 300, "60m": 300, "90m": 300, "1h": 300, "1d": 900}
+DEFAULT_TTL = 60
+MAX_BYTES = 256 * 1024 * 1024
+# How long a fetching process may hold a key before others give up waiting and fetch it themselves
+LEASE = 60
+POLL = 0.2
+# Incremental downloads (start=...) are stored under this period and serve any later start they cover
+TAIL = "tail"
+CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT, interval TEXT, period TEXT,
+    fetched REAL, expires REAL, accessed REAL,
+    first_ts INTEGER, tz TEXT, size INTEGER, data BLOB,
+    PRIMARY KEY (symbol, interval, period)
+);
+CREATE INDEX IF NOT EXISTS bars_accessed ON bars (accessed);
+CREATE TABLE IF NOT EXISTS leases (
+    symbol TEXT, interval TEXT, period TEXT, owner TEXT, expires REAL,
+    PRIMARY KEY (symbol, interval, period)
+);
+"""
+
+
+def encode(df):
+    index = df.index
+    tz = None
+    if index.tz is not None:
+        tz = getattr(index.tz, "zone", None) or getattr(index.tz, "key", None) or "UTC"
+        index = index.tz_convert("UTC")
+    buf = io.BytesIO()
+    np.savez(buf, ts=index.asi8, **{col: df[col].to_numpy(dtype="float64") for col in df.columns})
+    return buf.getvalue(), tz, int(index.asi8[0]) if len(index) else 0
+
+
+def decode(data, tz, start_ns=None):
+    with np.load(io.BytesIO(data)) as arrays:
+        ts = arrays["ts"]
+        keep = slice(int(np.searchsorted(ts, start_ns, side="left")), None) if start_ns is not None else slice(None)
+        columns = {name: arrays[name][keep] for name in arrays.files if name != "ts"}
+        index = pd.to_datetime(ts[keep], utc=True)
+    index = index.tz_convert(tz) if tz else index.tz_localize(None)
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def to_ns(start):
+    start = pd.Timestamp(start)
+    return (start.tz_convert("UTC") if start.tz is not None else start).value
+
+
+class SharedCache:
+    # Downloaded bars shared by every process on the box (both dashboards, the CLI scans, the service),
+    # keyed by (symbol, interval, period), with TTLs, LRU eviction by size and per-key fetch leases
+    def __init__(self, path=None, max_bytes=None, lease=LEASE):
+        self.path = path or os.environ.get("SHARED_CACHE_PATH", DEFAULT_PATH)
+        self.max_bytes = max_bytes or int(os.environ.get("SHARED_CACHE_MB", MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+        self.lease = lease
+        self.local = threading.local()
+        self.pid = os.getpid()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        # sqlite3 connections can't be shared across threads or forked workers, so each gets its own
+        if os.getpid() != self.pid:
+            self.local = threading.local()
+            self.pid = os.getpid()
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def read(self, tickers, interval, period=None, start=None):
+        # Returns ({ticker: df}, missing); a start-based read is served by any fresh entry that reaches back to start
+        db = self._connect()
+        now = time.time()
+        start_ns = to_ns(start) if start is not None else None
+        out = {}
+        for i in range(0, len(tickers), CHUNK):
+            chunk = tickers[i:i + CHUNK]
+            marks = ",".join("?" * len(chunk))
+            if start_ns is None:
+                rows = db.execute(f"SELECT symbol, period, data, tz FROM bars WHERE interval = ? AND period = ? AND expires > ? AND symbol IN ({marks})", [interval, period, now] + chunk)
+            else:
+                rows = db.execute(f"SELECT symbol, period, data, tz FROM bars WHERE interval = ? AND expires > ? AND first_ts <= ? AND symbol IN ({marks}) ORDER BY fetched", [interval, now, start_ns] + chunk)
+            hits = {}
+            for symbol, key, data, tz in rows:
+                hits[symbol] = key
+                out[symbol] = decode(data, tz, start_ns)
+            if hits:
+                db.executemany("UPDATE bars SET accessed = ? WHERE symbol = ? AND interval = ? AND period = ?", [(now, s, interval, key) for s, key in hits.items()])
+        missing = [t for t in tickers if t not in out]
+        metrics.hit("shared_cache", len(out))
+        metrics.miss("shared_cache", len(missing))
+        return out, missing
+
+    def write(self, frames, interval, period):
+        now = time.time()
+        expires = now + TTL.get(interval, DEFAULT_TTL)
+        if interval in INTERVAL_SECONDS:
+            # Never serve a bar past its close: a fetch just before it would otherwise hide the new bar
+            expires = min(expires, next_bar_close(interval, now))
+        rows = []
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            data, tz, first_ts = encode(df)
+            rows.append((symbol, interval, period, now, expires, now, first_ts, tz, len(data), data))
+        if not rows:
+            return
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._evict(db)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _evict(self, db):
+        # Least recently read entries go first once the cache is over its size bound
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM bars").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        for symbol, interval, period, size in db.execute("SELECT symbol, interval, period, size FROM bars ORDER BY accessed").fetchall():
+            db.execute("DELETE FROM bars WHERE symbol = ? AND interval = ? AND period = ?", (symbol, interval, period))
+            metrics.record("shared_cache_evict", nbytes=size)
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+
+    def acquire(self, tickers, interval, period):
+        # Takes the fetch lease for whichever keys nobody else holds; returns the tickers this process now owns
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        now = time.time()
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM leases WHERE expires <= ?", (now,))
+            db.executemany("INSERT OR IGNORE INTO leases VALUES (?, ?, ?, ?, ?)", [(t, interval, period, owner, now + self.lease) for t in tickers])
+            owned = set()
+            for i in range(0, len(tickers), CHUNK):
+                chunk = tickers[i:i + CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(f"SELECT symbol FROM leases WHERE interval = ? AND period = ? AND owner = ? AND symbol IN ({marks})", [interval, period, owner] + chunk)
+                owned.update(symbol for symbol, in rows)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return [t for t in tickers if t in owned]
+
+    def release(self, tickers, interval, period):
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        db = self._connect()
+        db.executemany("DELETE FROM leases WHERE symbol = ? AND interval = ? AND period = ? AND owner = ?", [(t, interval, period, owner) for t in tickers])
+
+    def clear(self):
+        db = self._connect()
+        db.execute("DELETE FROM bars")
+        db.execute("DELETE FROM leases")
+
+
+class SharedCacheProvider:
+    # Wraps a provider so a key is downloaded once per TTL across every process using the cache.
+    # Keys another process is already fetching are waited on instead of fetched again.
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = cache or get_shared_cache()
+
+    def download(self, tickers, interval, period=None, start=None):
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        key = TAIL if start is not None else period
+        out, missing = self.cache.read(tickers, interval, period, start)
+        while missing:
+            owned = self.cache.acquire(missing, interval, key)
+            if owned:
+                try:
+                    fetched = self.provider.download(owned, interval, period=period, start=start)
+                    self.cache.write(fetched, interval, key)
+                finally:
+                    self.cache.release(owned, interval, key)
+                out.update(fetched)
+            waiting = [t for t in missing if t not in owned]
+            if not waiting:
+                break
+            with metrics.stage("shared_cache_wait"):
+                time.sleep(POLL)
+            found, missing = self.cache.read(waiting, interval, period, start)
+            out.update(found)
+        return out
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SharedCache()
+        return _cache
+
+
+def set_shared_cache(cache):
+    global _cache
+    _cache = cache
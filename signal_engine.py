@@ -0,0 +1,193 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+import pandas as pd
+import requests
+import metrics
+from columnar import BarFrame, retention_for
+from market_data import fetch_frames
+from indicators import analyze_frame
+from streaming_indicators import SignalBook
+
+# Other timeframes (2m, 3m, 15m, 30m, 1h, ...) can be added on an existing interval/period;
+# they are aggregated from those bars locally and cost no extra download
+FRAMES = {
+    "1m": {"interval": "1m", "period": "1d", "weight": 0.35},
+    "5m": {"interval": "5m", "period": "5d", "weight": 0.30},
+    "10m": {"interval": "5m", "period": "5d", "weight": 0.20},
+    "1d": {"interval": "1d", "period": "90d", "weight": 0.15},
+}
+
+EMOJI_MAP = {2: "✅ STRONG BUY", 1: "🔼 BUY", 0: "⚖️ NEUTRAL", -1: "🔽 SELL", -2: "❌ STRONG SELL", None: "⚠️ No Data"}
+
+SERIES_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "RSI", "MACD", "Signal"]
+
+
+def confidence(signals, frames=FRAMES):
+    conf_score = 0
+    valid_weights = 0
+    for tf, score in signals.items():
+        if score is None:
+            continue
+        weight = frames[tf].get("weight", 0.25)
+        conf_score += score * weight
+        valid_weights += abs(weight)
+    return (conf_score / (2 * valid_weights)) * 100 if valid_weights > 0 else 0
+
+
+def hold_suggestion(bullish_frames):
+    hold_time = bullish_frames * 5
+    return f"Hold ~{hold_time} min ({bullish_frames} bars)" if bullish_frames > 0 else "Avoid or scalp only"
+
+
+def entry_exit(rsi_val, macd_val, macd_signal_val, rvol_val):
+    if rsi_val is None or macd_val is None or macd_signal_val is None:
+        return None
+    if 30 < rsi_val < 60 and macd_val > macd_signal_val and rvol_val and rvol_val >= 1.5:
+        return "entry"
+    if rsi_val > 70 and macd_val < macd_signal_val and rvol_val < 1:
+        return "exit"
+    return "none"
+
+
+def level2_pressure(rsi_val, macd_val, macd_signal_val, rvol_val):
+    if rsi_val is None or macd_val is None or macd_signal_val is None:
+        return None
+    if rsi_val < 50 and macd_val > macd_signal_val and rvol_val and rvol_val >= 1.5:
+        return "bids"
+    if rsi_val > 60 and macd_val < macd_signal_val and rvol_val < 1:
+        return "wall"
+    return "none"
+
+
+def _number(value):
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+@metrics.timed("evaluate")
+def evaluate(ticker, book, ticker_frames, frames=FRAMES):
+    for tf in frames:
+        # Seeded once, then only bars newer than the last one seen are applied
+        book.advance(ticker, tf, ticker_frames.get(tf))
+    return evaluate_states(ticker, book, frames)
+
+
+def evaluate_states(ticker, book, frames=FRAMES):
+    signals = {}
+    bullish_frames = 0
+    values = {"rsi": None, "macd": None, "signal": None, "rvol": None}
+    for tf in frames:
+        state = book.get(ticker, tf)
+        if state is None or not state.ready:
+            signals[tf] = None
+            continue
+        signals[tf] = state.score
+        if state.score > 0:
+            bullish_frames += 1
+        if tf == "1m":
+            values = {"rsi": state.rsi, "macd": state.macd, "signal": state.signal, "rvol": state.rvol}
+
+    values = {name: _number(value) for name, value in values.items()}
+    return {
+        "ticker": ticker,
+        "signals": signals,
+        "confidence": confidence(signals, frames),
+        "bullish_frames": bullish_frames,
+        "hold": hold_suggestion(bullish_frames),
+        **values,
+        "entry_exit": entry_exit(values["rsi"], values["macd"], values["signal"], values["rvol"]),
+        "pressure": level2_pressure(values["rsi"], values["macd"], values["signal"], values["rvol"]),
+        "updated": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def compute_signals(tickers, book, frames=FRAMES, store=None, provider=None, refresh=True):
+    frame_data = fetch_frames(tickers, frames, provider=provider, store=store, refresh=refresh)
+    results = {ticker: evaluate(ticker, book, frame_data[ticker], frames) for ticker in tickers}
+    # Indicator series for charts, one vectorized pass per timeframe, kept as compact
+    # float32 arrays trimmed to each timeframe's retention window
+    series = {ticker: {} for ticker in tickers}
+    for tf, params in frames.items():
+        enriched, _ = analyze_frame({t: frame_data[t].get(tf) for t in tickers})
+        for ticker, df in enriched.items():
+            series[ticker][tf] = BarFrame.from_frame(df, retention_for(tf, params))
+    return results, series
+
+
+def series_to_json(bars):
+    df = bars.to_frame()
+    cols = [col for col in SERIES_COLUMNS if col in df.columns]
+    return {"index": [ts.isoformat() for ts in df.index], "columns": cols, "data": df[cols].astype("float64").round(6).to_numpy().tolist()}
+
+
+def series_from_json(payload):
+    index = pd.to_datetime(payload["index"])
+    return BarFrame.from_frame(pd.DataFrame(payload["data"], index=index, columns=payload["columns"]))
+
+
+class RemoteSeries:
+    # Fetches chart series from the signal service only when a ticker's charts are drawn
+    def __init__(self, url, frames=FRAMES, timeout=10):
+        self.url = url
+        self.frames = frames
+        self.timeout = timeout
+
+    def get(self, ticker, default=None):
+        out = {}
+        for tf in self.frames:
+            response = requests.get(f"{self.url}/series", params={"ticker": ticker, "tf": tf}, timeout=self.timeout)
+            if response.status_code == 200:
+                out[tf] = series_from_json(response.json())
+        return out or default
+
+
+def service_url():
+    return os.environ.get("SIGNAL_SERVICE_URL", "").rstrip("/")
+
+
+def load_signals(tickers, book=None, store=None, frames=FRAMES, timeout=30):
+    # Uses the shared signal service when SIGNAL_SERVICE_URL is set, otherwise computes in-process
+    tickers = list(tickers)
+    url = service_url()
+    if url:
+        response = requests.get(f"{url}/signals", params={"tickers": ",".join(tickers)}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["signals"], RemoteSeries(url, frames)
+    return compute_signals(tickers, book or SignalBook(), frames, store=store)
+
+
+def stream_signals(tickers, book=None, store=None, frames=FRAMES, timeout=30, max_workers=4):
+    # Like load_signals, but yields (ticker, result, series) as each ticker is ready so pages can render
+    # sections one by one; series.get(ticker) gives that ticker's chart bars. The service is asked for
+    # each ticker concurrently. In-process, bars still come from one grouped download (yfinance can't
+    # run downloads concurrently) and one indicator pass per timeframe; each ticker is then evaluated
+    # and yielded in turn.
+    tickers = list(tickers)
+    url = service_url()
+    if url:
+        remote = RemoteSeries(url, frames)
+
+        def fetch(ticker):
+            response = requests.get(f"{url}/signals", params={"tickers": ticker}, timeout=timeout)
+            response.raise_for_status()
+            return response.json()["signals"].get(ticker, {})
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(fetch, ticker): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                yield futures[future], future.result(), remote
+        return
+    book = book or SignalBook()
+    frame_data = fetch_frames(tickers, frames, store=store)
+    enriched = {tf: analyze_frame({t: frame_data[t].get(tf) for t in tickers})[0] for tf in frames}
+    for ticker in tickers:
+        result = evaluate(ticker, book, frame_data[ticker], frames)
+        series = {}
+        for tf, params in frames.items():
+            if ticker in enriched[tf]:
+                series[tf] = BarFrame.from_frame(enriched[tf][ticker], retention_for(tf, params))
+        yield ticker, result, {ticker: series}
@@ -0,0 +1,206 @@
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import gappers
+import metrics
+import risk
+from alerts import AlertEngine, LogSink, PrintSink
+from bar_store import get_store
+from scheduler import RateLimiter, RefreshScheduler
+from signal_engine import FRAMES, compute_signals, evaluate_states, series_to_json
+from stream_ingest import ReplaySource, StreamIngestor
+from streaming_indicators import SignalBook
+
+
+class SignalService:
+    # Computes signals once per bar close for the whole watchlist; every HTTP client reads the same results
+    def __init__(self, tickers=(), frames=FRAMES, store=None, limiter=None, alerts=None):
+        self.frames = frames
+        self.store = store or get_store()
+        self.book = SignalBook()
+        self.tickers = list(dict.fromkeys(tickers))
+        self.results = {}
+        self.series = {}
+        self.lock = threading.Lock()
+        self.scheduler = RefreshScheduler(frames, self.refresh, limiter=limiter)
+        self.alerts = alerts
+        self.stop_event = threading.Event()
+        if alerts is not None:
+            alerts.book = self.book
+
+    def compute(self, tickers, refresh=True):
+        if not tickers:
+            return
+        results, series = compute_signals(tickers, self.book, self.frames, store=self.store, refresh=refresh)
+        with self.lock:
+            self.results.update(results)
+            self.series.update(series)
+
+    def refresh(self, interval, period):
+        # Only the interval whose bar just closed is fetched; other frames are read from the store
+        with self.lock:
+            tickers = list(self.tickers)
+        if not tickers:
+            return
+        self.store.update(tickers, interval, period)
+        self.compute(tickers, refresh=False)
+        if self.alerts is not None:
+            for tf, params in self.frames.items():
+                if params["interval"] == interval:
+                    for ticker in tickers:
+                        self.alerts.evaluate(ticker, tf)
+
+    def watch(self, tickers):
+        with self.lock:
+            new = [t for t in tickers if t not in self.tickers]
+            self.tickers.extend(new)
+        # Tickers seen for the first time are computed right away instead of waiting for the next bar
+        self.compute(new)
+        with self.lock:
+            return {t: self.results[t] for t in tickers if t in self.results}
+
+    def on_bar(self, symbol, tf, ts, bar):
+        # Streamed bars update only this symbol's state; the other frames keep their last values
+        if tf not in self.frames:
+            return
+        ts = pd.Timestamp(ts, tz="UTC")
+        self.book.update(symbol, tf, ts, bar[3], bar[4])
+        result = evaluate_states(symbol, self.book, self.frames)
+        with self.lock:
+            self.results[symbol] = result
+        if self.alerts is not None:
+            self.alerts.evaluate(symbol, tf, ts)
+
+    def scan(self, every=60, max_price=50):
+        # Follows the merged screeners; only names new to the list get their signals computed
+        def loop():
+            while not self.stop_event.is_set():
+                try:
+                    df = gappers.load_gappers(max_price=max_price)
+                    self.watch(df.attrs["diff"]["new"])
+                except Exception as e:
+                    print(f"Screener scan failed: {e}")
+                self.stop_event.wait(every)
+
+        thread = threading.Thread(target=loop, name="screener-scan", daemon=True)
+        thread.start()
+        return thread
+
+    def ingest(self, source):
+        self.ingestor = StreamIngestor(self.on_bar)
+        thread = threading.Thread(target=self.ingestor.run, args=(source,), name="stream-ingest", daemon=True)
+        thread.start()
+        return thread
+
+    def run(self):
+        try:
+            with self.lock:
+                tickers = list(self.tickers)
+            self.compute(tickers)
+        except Exception as e:
+            print(f"Initial signal load failed: {e}")
+        self.scheduler.run()
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="signal-service", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+        self.scheduler.stop()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload, content_type="application/json"):
+            body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/health":
+                self._send(200, {"status": "ok", "tickers": len(service.tickers)})
+            elif url.path == "/metrics":
+                self._send(200, metrics.to_prometheus(), "text/plain; version=0.0.4")
+            elif url.path == "/signals":
+                tickers = [t.strip().upper() for t in ",".join(query.get("tickers", [])).split(",") if t.strip()]
+                if tickers:
+                    signals = service.watch(tickers)
+                else:
+                    with service.lock:
+                        signals = dict(service.results)
+                self._send(200, {"signals": signals})
+            elif url.path == "/risk":
+                try:
+                    capital = float(query.get("capital", ["0"])[0])
+                except ValueError:
+                    capital = 0
+                if capital <= 0:
+                    self._send(400, {"error": "capital must be a positive number"})
+                    return
+                tickers = [t.strip().upper() for t in ",".join(query.get("tickers", [])).split(",") if t.strip()]
+                with service.lock:
+                    results = {t: r for t, r in service.results.items() if not tickers or t in tickers}
+                # Sizes the requested (default: every watched) ticker with a positive score from bars already in the store
+                plan = risk.plan_positions(results, capital, store=service.store, refresh=False)
+                self._send(200, {"capital": capital, "positions": plan.reset_index().to_dict(orient="records")})
+            elif url.path == "/series":
+                ticker = query.get("ticker", [""])[0].upper()
+                tf = query.get("tf", [""])[0]
+                with service.lock:
+                    bars = service.series.get(ticker, {}).get(tf)
+                if bars is None:
+                    self._send(404, {"error": f"no series for {ticker} {tf}"})
+                else:
+                    self._send(200, series_to_json(bars))
+            else:
+                self._send(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless signal service with a JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tickers", default="", help="comma-separated watchlist to compute from startup")
+    parser.add_argument("--max-requests-per-minute", type=int, default=30, help="upstream refresh rate limit")
+    parser.add_argument("--replay", help="tick CSV (timestamp,symbol,price,size) to stream bars from")
+    parser.add_argument("--replay-speed", type=float, help="1.0 keeps recorded pacing; omit to replay at full speed")
+    parser.add_argument("--scan-every", type=float, help="seconds between screener scans; new gappers are added to the watchlist")
+    parser.add_argument("--alerts-log", help="evaluate entry/exit alerts and append them to this JSON-lines file")
+    args = parser.parse_args()
+
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    alerts = AlertEngine(sinks=[PrintSink(), LogSink(args.alerts_log)]) if args.alerts_log else None
+    service = SignalService(tickers, limiter=RateLimiter(per_minute=args.max_requests_per_minute), alerts=alerts)
+    service.start()
+    if args.scan_every:
+        service.scan(args.scan_every)
+    if args.replay:
+        service.ingest(ReplaySource(args.replay, args.replay_speed))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"📡 Signal service on http://{args.host}:{args.port} ({len(tickers)} tickers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
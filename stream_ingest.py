@@ -0,0 +1,145 @@
+import csv
+import time
+import numpy as np
+import pandas as pd
+
+TIMEFRAMES = {"1m": 60, "5m": 300, "10m": 600}
+NS = 1_000_000_000
+
+
+class BarRing:
+    # Fixed-capacity OHLCV history; the oldest bar is overwritten once full
+    __slots__ = ("capacity", "ts", "ohlcv", "pos", "count")
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype="int64")
+        self.ohlcv = np.zeros((capacity, 5), dtype="float64")
+        self.pos = 0
+        self.count = 0
+
+    def append(self, ts, bar):
+        self.ts[self.pos] = ts
+        self.ohlcv[self.pos] = bar
+        self.pos = (self.pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def arrays(self):
+        # Chronological order; a view while the buffer hasn't wrapped, a copy after
+        if self.count < self.capacity:
+            return self.ts[:self.count], self.ohlcv[:self.count]
+        order = np.r_[self.pos:self.capacity, 0:self.pos]
+        return self.ts[order], self.ohlcv[order]
+
+    def frame(self, tz="America/New_York"):
+        ts, ohlcv = self.arrays()
+        index = pd.to_datetime(ts, utc=True).tz_convert(tz)
+        return pd.DataFrame(ohlcv, index=index, columns=["Open", "High", "Low", "Close", "Volume"])
+
+
+class BarBuilder:
+    __slots__ = ("step", "bucket", "open", "high", "low", "close", "volume", "first", "last")
+
+    def __init__(self, step):
+        self.step = step
+        self.bucket = None
+
+    def add(self, ts, price, size):
+        # Returns the finished bar (bucket start, [o, h, l, c, v]) when the tick opens a new bucket
+        bucket = ts - ts % (self.step * NS)
+        closed = None
+        if self.bucket is not None and bucket > self.bucket:
+            closed = self.take()
+        if self.bucket is None:
+            self.bucket = bucket
+            self.open = self.high = self.low = self.close = price
+            self.first = self.last = ts
+            self.volume = 0.0
+        elif bucket < self.bucket:
+            # Late tick for a bar that already closed
+            return closed
+        # Ticks can arrive out of order within a bar: open and close follow the earliest and latest timestamps
+        if ts < self.first:
+            self.open, self.first = price, ts
+        if ts >= self.last:
+            self.close, self.last = price, ts
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.volume += size
+        return closed
+
+    def take(self):
+        if self.bucket is None:
+            return None
+        bar = (self.bucket, (self.open, self.high, self.low, self.close, self.volume))
+        self.bucket = None
+        return bar
+
+
+class StreamIngestor:
+    # Aggregates ticks into per-symbol bars and calls on_bar(symbol, tf, ts, bar) as each bar closes
+    def __init__(self, on_bar=None, timeframes=TIMEFRAMES, capacity=500):
+        self.on_bar = on_bar
+        self.timeframes = timeframes
+        self.capacity = capacity
+        self.builders = {}
+        self.rings = {}
+
+    def _builders(self, symbol):
+        builders = self.builders.get(symbol)
+        if builders is None:
+            builders = self.builders[symbol] = {tf: BarBuilder(step) for tf, step in self.timeframes.items()}
+            for tf in self.timeframes:
+                self.rings[(symbol, tf)] = BarRing(self.capacity)
+        return builders
+
+    def _emit(self, symbol, tf, bar):
+        ts, values = bar
+        self.rings[(symbol, tf)].append(ts, values)
+        if self.on_bar is not None:
+            self.on_bar(symbol, tf, ts, values)
+
+    def on_tick(self, symbol, ts, price, size):
+        for tf, builder in self._builders(symbol).items():
+            bar = builder.add(ts, price, size)
+            if bar is not None:
+                self._emit(symbol, tf, bar)
+
+    def flush(self):
+        for symbol, builders in self.builders.items():
+            for tf, builder in builders.items():
+                bar = builder.take()
+                if bar is not None:
+                    self._emit(symbol, tf, bar)
+
+    def run(self, source):
+        for symbol, ts, price, size in source:
+            self.on_tick(symbol, ts, price, size)
+        self.flush()
+
+    def frame(self, symbol, tf):
+        ring = self.rings.get((symbol, tf))
+        return ring.frame() if ring is not None else pd.DataFrame()
+
+
+class ReplaySource:
+    # Replays ticks from a CSV with timestamp,symbol,price,size columns.
+    # speed=None replays as fast as possible; speed=1.0 keeps the recorded pacing.
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+
+    def __iter__(self):
+        started = None
+        first_ts = None
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                ts = pd.Timestamp(row["timestamp"])
+                ts = (ts.tz_localize("UTC") if ts.tz is None else ts).value
+                if self.speed:
+                    if started is None:
+                        started, first_ts = time.monotonic(), ts
+                    delay = (ts - first_ts) / NS / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                yield row["symbol"], ts, float(row["price"]), float(row.get("size") or 0)
@@ -0,0 +1,236 @@
+import math
+import threading
+from array import array
+from indicators import score_signal
+
+# Constant-time indicator state, advanced one bar at a time. Each state
+# reproduces the pandas_ta value for the same bars (see indicators.py).
+
+
+class EMAState:
+    __slots__ = ("length", "alpha", "seed_sma", "count", "total", "value")
+
+    def __init__(self, length, seed_sma=True):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed_sma = seed_sma
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def update(self, x):
+        self.count += 1
+        if self.value is None:
+            if not self.seed_sma:
+                self.value = x
+                return self.value
+            self.total += x
+            if self.count == self.length:
+                self.value = self.total / self.length
+            return self.value
+        self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def copy(self):
+        return _copy_slots(self)
+
+
+class RMAState:
+    # Wilder smoothing as pandas ewm(alpha=1/length, adjust=True): running weighted sum and weight
+    __slots__ = ("length", "decay", "count", "num", "den")
+
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1 - 1.0 / length
+        self.count = 0
+        self.num = 0.0
+        self.den = 0.0
+
+    def update(self, x):
+        self.count += 1
+        self.num = x + self.decay * self.num
+        self.den = 1 + self.decay * self.den
+        return self.num / self.den if self.count >= self.length else None
+
+    def copy(self):
+        return _copy_slots(self)
+
+
+class RSIState:
+    __slots__ = ("prev", "gain", "loss", "value")
+
+    def __init__(self, length=14):
+        self.prev = None
+        self.gain = RMAState(length)
+        self.loss = RMAState(length)
+        self.value = None
+
+    def update(self, close):
+        if self.prev is None:
+            self.prev = close
+            return None
+        delta = close - self.prev
+        self.prev = close
+        avg_gain = self.gain.update(max(delta, 0.0))
+        avg_loss = self.loss.update(max(-delta, 0.0))
+        if avg_gain is None:
+            return None
+        total = avg_gain + avg_loss
+        self.value = 100 * avg_gain / total if total else math.nan
+        return self.value
+
+    def copy(self):
+        new = _copy_slots(self)
+        new.gain, new.loss = self.gain.copy(), self.loss.copy()
+        return new
+
+
+class MACDState:
+    __slots__ = ("fast", "slow", "signal", "line", "signal_value")
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.line = None
+        self.signal_value = None
+
+    def update(self, close):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is None or slow is None:
+            return None, None
+        self.line = fast - slow
+        self.signal_value = self.signal.update(self.line)
+        return self.line, self.signal_value
+
+    def copy(self):
+        new = _copy_slots(self)
+        new.fast, new.slow, new.signal = self.fast.copy(), self.slow.copy(), self.signal.copy()
+        return new
+
+
+class RollingMeanState:
+    __slots__ = ("length", "buf", "pos", "count", "total")
+
+    def __init__(self, length=10):
+        self.length = length
+        self.buf = array("d", [0.0] * length)
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, x):
+        if self.count == self.length:
+            self.total -= self.buf[self.pos]
+        else:
+            self.count += 1
+        self.buf[self.pos] = x
+        self.total += x
+        self.pos = (self.pos + 1) % self.length
+        return self.total / self.length if self.count == self.length else None
+
+    def copy(self):
+        new = _copy_slots(self)
+        new.buf = array("d", self.buf)
+        return new
+
+
+def _copy_slots(obj):
+    new = object.__new__(type(obj))
+    for name in type(obj).__slots__:
+        setattr(new, name, getattr(obj, name))
+    return new
+
+
+class SignalState:
+    # RSI/MACD/RVOL for one (ticker, timeframe). Pushing the same timestamp again
+    # replaces that bar, so a still-forming last bar can be revised on every refresh.
+    __slots__ = ("rsi_state", "macd_state", "volume_state", "last_ts", "volume", "_prev")
+
+    def __init__(self):
+        self.rsi_state = RSIState(14)
+        self.macd_state = MACDState(12, 26, 9)
+        self.volume_state = RollingMeanState(10)
+        self.last_ts = None
+        self.volume = None
+        self._prev = None
+
+    def _snapshot(self):
+        return (self.rsi_state.copy(), self.macd_state.copy(), self.volume_state.copy(), self.volume)
+
+    def update(self, ts, close, volume, revisable=True):
+        if self.last_ts is not None and (ts < self.last_ts or (ts == self.last_ts and self._prev is None)):
+            return
+        if ts == self.last_ts and self._prev is not None:
+            self.rsi_state, self.macd_state, self.volume_state, self.volume = self._prev
+            self._prev = self._snapshot()
+        else:
+            self._prev = self._snapshot() if revisable else None
+        self.rsi_state.update(close)
+        self.macd_state.update(close)
+        self.volume_state.update(volume)
+        self.volume = volume
+        self.last_ts = ts
+
+    def advance(self, df):
+        if df is None or df.empty:
+            return self
+        if self.last_ts is not None:
+            df = df[df.index >= self.last_ts]
+        last = len(df) - 1
+        for i, (ts, close, volume) in enumerate(zip(df.index, df["Close"].to_numpy(), df["Volume"].to_numpy())):
+            # Only the newest bar can still change, so only it keeps an undo snapshot
+            self.update(ts, float(close), float(volume), revisable=i == last)
+        return self
+
+    @property
+    def rsi(self):
+        return self.rsi_state.value
+
+    @property
+    def macd(self):
+        return self.macd_state.line
+
+    @property
+    def signal(self):
+        return self.macd_state.signal_value
+
+    @property
+    def rvol(self):
+        mean = self.volume_state.total / self.volume_state.length if self.volume_state.count == self.volume_state.length else None
+        return self.volume / mean if mean else 0
+
+    @property
+    def ready(self):
+        return self.rsi is not None and not math.isnan(self.rsi) and self.signal is not None
+
+    @property
+    def score(self):
+        return score_signal(self.rsi, self.macd, self.signal) if self.ready else None
+
+
+class SignalBook:
+    # Long-lived SignalState per (ticker, timeframe), safe to share across threads
+    def __init__(self):
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def advance(self, ticker, tf, df):
+        with self.lock:
+            state = self.states.get((ticker, tf))
+            if state is None:
+                state = self.states[(ticker, tf)] = SignalState()
+            return state.advance(df)
+
+    def update(self, ticker, tf, ts, close, volume):
+        # For bars that arrive already closed, e.g. from a live stream
+        with self.lock:
+            state = self.states.get((ticker, tf))
+            if state is None:
+                state = self.states[(ticker, tf)] = SignalState()
+            state.update(ts, close, volume, revisable=False)
+            return state
+
+    def get(self, ticker, tf):
+        return self.states.get((ticker, tf))
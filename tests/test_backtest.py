@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import align_to_base, bar_duration, precompute
+from signal_engine import FRAMES
+
+DAY = bar_duration("1d", FRAMES["1d"])
+
+
+def daily(dates=("2024-06-12", "2024-06-13", "2024-06-14"), index=None):
+    # Yahoo returns daily bars as tz-naive session dates; each bar's value is its position
+    index = pd.DatetimeIndex(dates) if index is None else index
+    return pd.DataFrame({"RSI": np.arange(1.0, len(index) + 1)}, index=index)
+
+
+def seen(frame, base_index):
+    return align_to_base(frame, DAY, base_index)["RSI"].tolist()
+
+
+def test_intraday_bar_sees_only_the_previous_sessions_daily_bar():
+    base = pd.DatetimeIndex(["2024-06-14 10:00", "2024-06-14 15:59", "2024-06-14 16:00"]).tz_localize("America/New_York")
+    # At 10:00 on the 14th its own daily bar hasn't closed; the 13th's is the latest known
+    assert seen(daily(), base) == [2.0, 2.0, 3.0]
+
+
+def test_daily_alignment_holds_for_utc_and_naive_base_frames():
+    utc = pd.DatetimeIndex(["2024-06-14 14:00", "2024-06-14 20:00"]).tz_localize("UTC")
+    assert seen(daily(), utc) == [2.0, 3.0]
+    naive = pd.DatetimeIndex(["2024-06-14 10:00", "2024-06-14 16:00"])
+    assert seen(daily(), naive) == [2.0, 3.0]
+    # Dates parsed from a CSV carry a fixed offset at midnight; they are still session dates
+    offset = pd.DatetimeIndex(["2024-06-13 00:00-04:00", "2024-06-14 00:00-04:00"])
+    assert seen(daily(index=offset), pd.DatetimeIndex(["2024-06-14 10:00"]).tz_localize("America/New_York")) == [1.0]
+
+
+def test_intraday_bars_are_known_at_their_close():
+    index = pd.date_range("2024-06-14 09:30", periods=3, freq="5min", tz="America/New_York")
+    five = pd.DataFrame({"RSI": [1.0, 2.0, 3.0]}, index=index)
+    base = pd.date_range("2024-06-14 09:34", periods=4, freq="1min", tz="America/New_York")
+    aligned = align_to_base(five, pd.Timedelta(minutes=5), base)["RSI"]
+    assert np.isnan(aligned.iloc[0])
+    assert aligned.iloc[1:].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_mixed_intraday_timezones_are_rejected():
+    index = pd.date_range("2024-06-14 09:30", periods=3, freq="5min")
+    base = pd.date_range("2024-06-14 09:30", periods=3, freq="1min", tz="America/New_York")
+    with pytest.raises(ValueError):
+        align_to_base(pd.DataFrame({"RSI": [1.0, 2.0, 3.0]}, index=index), pd.Timedelta(minutes=5), base)
+
+
+def test_precompute_never_reads_the_current_sessions_daily_close():
+    minutes = pd.date_range("2024-06-14 09:30", periods=390, freq="1min", tz="America/New_York")
+    days = pd.bdate_range("2024-03-01", "2024-06-14")
+    rng = np.random.default_rng(5)
+
+    def frame(index):
+        close = 100 + np.cumsum(rng.normal(0, 1, len(index)))
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0}, index=index)
+
+    ticker_frames = {"1m": frame(minutes), "1d": frame(days)}
+    # Spike the current session's close: nothing during that session may see its effect
+    ticker_frames["1d"].iloc[-1, ticker_frames["1d"].columns.get_loc("Close")] *= 10
+    out = precompute(ticker_frames, {tf: FRAMES[tf] for tf in ("1m", "1d")})
+    rsi = out["frames"]["1d"]["RSI"]
+    assert rsi.nunique() == 1
+    assert rsi.iloc[0] < 99
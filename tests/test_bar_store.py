@@ -0,0 +1,121 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from bar_store import BarStore
+
+
+def bars(n=400, start="2024-06-10 09:30", tz="America/New_York", seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq="1min", tz=tz)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    return pd.DataFrame({
+        "Open": close + 0.01, "High": close + 0.2, "Low": close - 0.2, "Close": close,
+        "Volume": rng.integers(100, 10_000, n).astype("float64"),
+    }, index=index)
+
+
+def assert_same(actual, expected):
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_writes_match_one_shot_write(tmp_path, seed):
+    full = bars(seed=seed)
+    rng = np.random.default_rng(seed)
+    warm = BarStore(str(tmp_path / "warm"))
+    end = 0
+    while end < len(full):
+        # Each refresh re-sends the last stored bar or more (the overlap), then some new ones
+        start = max(0, end - int(rng.integers(1, 4)))
+        end = min(len(full), end + int(rng.integers(1, 60)))
+        warm.write("AAPL", "1m", full.iloc[start:end])
+    cold = BarStore(str(tmp_path / "cold"))
+    cold.write("AAPL", "1m", full)
+    assert_same(warm.frame("AAPL", "1m"), cold.frame("AAPL", "1m"))
+    assert_same(warm.frame("AAPL", "1m"), full)
+
+
+def test_last_bar_revision_overwrites_in_place(tmp_path):
+    full = bars(10)
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", "1m", full.iloc[:5])
+    path = tmp_path / "1m" / "AAPL" / "close.npy"
+    # The partial last bar comes back final, with the next bars
+    revised = full.iloc[4:8].copy()
+    revised.iloc[0, revised.columns.get_loc("Close")] = 123.0
+    inode = path.stat().st_ino
+    store.write("AAPL", "1m", revised)
+    assert path.stat().st_ino == inode
+    df = store.frame("AAPL", "1m")
+    assert len(df) == 8
+    assert df["Close"].iloc[4] == 123.0
+    assert_same(df.iloc[:4], full.iloc[:4])
+    assert np.load(path).shape == (8,)
+
+
+def test_shorter_rewrite_replaces_files(tmp_path):
+    full = bars(10)
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", "1m", full)
+    mapped = store.columns("AAPL", "1m")["close"]
+    # Rewriting from bar 2 with only three bars shrinks the history, so the files are replaced, never
+    # truncated under a reader still mapping them
+    store.write("AAPL", "1m", full.iloc[2:5])
+    assert len(mapped) == 10 and mapped[9] == full["Close"].iloc[9]
+    assert_same(store.frame("AAPL", "1m"), full.iloc[:5])
+
+
+def test_second_instance_reads_the_same_files(tmp_path):
+    full = bars(60)
+    writer, reader = BarStore(str(tmp_path)), BarStore(str(tmp_path))
+    writer.write("AAPL", "1m", full.iloc[:20])
+    assert_same(reader.frame("AAPL", "1m"), full.iloc[:20])
+    # The reader has the columns mapped; an in-place append by the writer must still be seen
+    writer.write("AAPL", "1m", full.iloc[19:50])
+    assert_same(reader.frame("AAPL", "1m"), full.iloc[:50])
+    assert reader.last_timestamp("AAPL", "1m") == full.index[49].tz_convert("UTC")
+    # And the reader can append after the writer
+    reader.write("AAPL", "1m", full.iloc[49:])
+    assert_same(writer.frame("AAPL", "1m"), full)
+
+
+def test_timezone_is_kept_and_naive_daily_bars_stay_naive(tmp_path):
+    store = BarStore(str(tmp_path))
+    daily = bars(5, start="2024-06-10", tz=None).set_axis(pd.bdate_range("2024-06-10", periods=5))
+    store.write("AAPL", "1d", daily.iloc[:3])
+    store.write("AAPL", "1d", daily.iloc[2:])
+    assert_same(store.frame("AAPL", "1d"), daily)
+    store.write("AAPL", "1m", bars(5))
+    assert str(store.frame("AAPL", "1m").index.tz) == "America/New_York"
+
+
+def test_period_slices_sessions(tmp_path):
+    store = BarStore(str(tmp_path))
+    two_days = pd.concat([bars(30, start="2024-06-13 09:30"), bars(30, start="2024-06-14 09:30")])
+    store.write("AAPL", "1m", two_days)
+    assert len(store.frame("AAPL", "1m", "1d")) == 30
+    assert len(store.frame("AAPL", "1m", "5d")) == 60
+
+
+def test_concurrent_writers_on_one_symbol(tmp_path):
+    full = bars(600)
+    store = BarStore(str(tmp_path))
+    errors = []
+
+    def write(offset):
+        try:
+            for end in range(100 + offset, 600, 50):
+                store.write("AAPL", "1m", full.iloc[max(0, end - 120):end])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    df = store.frame("AAPL", "1m")
+    assert df.index.is_monotonic_increasing and not df.index.has_duplicates
+    assert_same(df, full.iloc[:len(df)])
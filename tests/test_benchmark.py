@@ -0,0 +1,40 @@
+import json
+import sys
+import fundamentals
+import gappers
+import volume_index
+import benchmark
+
+STAGES = ["volume_index", "gapper_scan", "gapper_rescan", "frames_cold", "frames_warm", "signals", "risk", "news", "end_to_end"]
+
+
+def test_benchmark_runs_on_synthetic_fixtures(tmp_path, monkeypatch):
+    # run_size points these module globals at the synthetic fixtures; restore them afterwards
+    monkeypatch.setattr(gappers, "yf", gappers.yf)
+    monkeypatch.setattr(fundamentals, "_cache", fundamentals._cache)
+    monkeypatch.setattr(volume_index, "_index", volume_index._index)
+    out = tmp_path / "bench.jsonl"
+    monkeypatch.setattr(sys, "argv", ["benchmark.py", "--sizes", "5", "--workers", "2", "--out", str(out)])
+    benchmark.main()
+
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [row["stage"] for row in rows] == STAGES
+    for row in rows:
+        assert row["symbols"] == 5
+        assert row["seconds"] > 0
+        assert row["peak_rss_mb"] > 0
+    assert all("substages" in row for row in rows if row["stage"] != "end_to_end")
+
+    # Against itself nothing regresses; against a baseline twice as fast every stage does
+    assert benchmark.compare(rows, str(out), 0.25) == []
+    fast = tmp_path / "fast.jsonl"
+    fast.write_text("".join(json.dumps({**row, "seconds": row["seconds"] / 2}) + "\n" for row in rows))
+    assert len(benchmark.compare(rows, str(fast), 0.25)) == len(rows)
+
+
+def test_synthetic_provider_is_deterministic():
+    first = benchmark.SyntheticProvider().download(["AAAA", "AAAB"], "5m", period="5d")
+    second = benchmark.SyntheticProvider().download(["AAAB"], "5m", period="5d")
+    assert set(first) == {"AAAA", "AAAB"}
+    assert first["AAAB"].equals(second["AAAB"])
+    assert not first["AAAA"].equals(first["AAAB"])
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from columnar import BarFrame
+
+
+def frame(n=5):
+    index = pd.date_range("2024-06-14 09:30", periods=n, freq="1min", tz="America/New_York")
+    close = np.arange(1.0, n + 1)
+    return BarFrame.from_frame(pd.DataFrame({"Close": close, "Volume": 100.0}, index=index))
+
+
+def test_tail_returns_views_of_the_last_bars():
+    bars = frame()
+    tail = bars.tail(2)
+    assert tail["Close"].tolist() == [4.0, 5.0]
+    assert np.shares_memory(tail["Close"], bars["Close"])
+    assert len(bars.tail(10)) == 5
+
+
+def test_tail_of_zero_or_less_is_empty():
+    bars = frame()
+    for n in (0, -1):
+        tail = bars.tail(n)
+        assert tail.empty and tail.last() == {}
+        assert tail["Close"].dtype == np.float32 and tail.tz == bars.tz
+        assert tail.to_frame().empty
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from indicators import ema, macd, rsi
+
+# The panel indicators must match pandas_ta per ticker. pandas_ta itself is compared when it is
+# installed; the reference loops below follow its formulas step by step so the check always runs:
+# RSI averages gains and losses with an adjusted EWM (alpha 1/length), EMA is seeded with the SMA
+# of its first `length` values, and MACD's signal line is the EMA of the MACD line from its first value.
+
+
+def fixture_close(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-06-03 09:30", periods=n, freq="5min", tz="America/New_York")
+    return pd.Series(50 * np.exp(np.cumsum(rng.normal(0, 0.004, n))), index=index)
+
+
+def gap_panel():
+    # Two tickers on one calendar; B misses a few bars the way thin names do
+    a = fixture_close(seed=7)
+    b = fixture_close(seed=11)
+    b.iloc[[0, 1, 15, 40, 41, 42, 90]] = np.nan
+    return pd.DataFrame({"A": a, "B": b})
+
+
+def ref_rma(values, length):
+    alpha = 1.0 / length
+    out = np.full(len(values), np.nan)
+    num = den = 0.0
+    for i, x in enumerate(values):
+        num = num * (1 - alpha) + x
+        den = den * (1 - alpha) + 1
+        if i + 1 >= length:
+            out[i] = num / den
+    return out
+
+
+def ref_rsi(close, length=14):
+    delta = np.diff(close)
+    gain = ref_rma(np.clip(delta, 0, None), length)
+    loss = ref_rma(np.clip(-delta, 0, None), length)
+    return np.r_[np.nan, 100 * gain / (gain + loss)]
+
+
+def ref_ema(values, length):
+    alpha = 2.0 / (length + 1)
+    out = np.full(len(values), np.nan)
+    out[length - 1] = np.mean(values[:length])
+    for i in range(length, len(values)):
+        out[i] = alpha * values[i] + (1 - alpha) * out[i - 1]
+    return out
+
+
+def ref_macd(close, fast=12, slow=26, signal=9):
+    line = ref_ema(close, fast) - ref_ema(close, slow)
+    signal_line = np.full(len(close), np.nan)
+    signal_line[slow - 1:] = ref_ema(line[slow - 1:], signal)
+    return line, signal_line, line - signal_line
+
+
+def assert_matches(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, dtype="float64"), expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_rsi_matches_reference():
+    close = fixture_close()
+    assert_matches(rsi(close.to_frame("A"))["A"], ref_rsi(close.to_numpy()))
+
+
+def test_ema_matches_reference():
+    close = fixture_close()
+    for length in (9, 20):
+        assert_matches(ema(close.to_frame("A"), length)["A"], ref_ema(close.to_numpy(), length))
+
+
+def test_macd_matches_reference():
+    close = fixture_close()
+    for actual, expected in zip(macd(close.to_frame("A")), ref_macd(close.to_numpy())):
+        assert_matches(actual["A"], expected)
+
+
+def test_panel_gaps_match_each_tickers_own_series():
+    panel = gap_panel()
+    rsi_panel, ema_panel = rsi(panel), ema(panel, 20)
+    line, signal_line, hist = macd(panel)
+    for ticker in panel:
+        valid = panel[ticker].notna().to_numpy()
+        own = panel[ticker].dropna().to_numpy()
+        assert rsi_panel[ticker][~valid].isna().all()
+        assert_matches(rsi_panel[ticker][valid], ref_rsi(own))
+        assert_matches(ema_panel[ticker][valid], ref_ema(own, 20))
+        for actual, expected in zip((line, signal_line, hist), ref_macd(own)):
+            assert_matches(actual[ticker][valid], expected)
+
+
+def test_pandas_ta_parity():
+    ta = pytest.importorskip("pandas_ta")
+    panel = gap_panel()
+    rsi_panel, ema_panel = rsi(panel), ema(panel, 20)
+    line, signal_line, hist = macd(panel)
+    for ticker in panel:
+        own = panel[ticker].dropna()
+        expected = ta.macd(own, fast=12, slow=26, signal=9)
+        assert_matches(rsi_panel[ticker].reindex(own.index), ta.rsi(own, length=14).to_numpy())
+        assert_matches(ema_panel[ticker].reindex(own.index), ta.ema(own, length=20).to_numpy())
+        assert_matches(line[ticker].reindex(own.index), expected["MACD_12_26_9"].to_numpy())
+        assert_matches(signal_line[ticker].reindex(own.index), expected["MACDs_12_26_9"].to_numpy())
+        assert_matches(hist[ticker].reindex(own.index), expected["MACDh_12_26_9"].to_numpy())
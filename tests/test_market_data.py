@@ -0,0 +1,107 @@
+import os
+import numpy as np
+import pandas as pd
+from market_data import FixtureProvider, fetch_frames, finer_source, split_by_ticker
+from resampler import Resampler, splice
+from signal_engine import FRAMES
+
+# Recorded bars for 2024-06-14: 5m from 09:30 to 10:05, where the 10:05 bar was still forming when it was
+# fetched, and 1m from 10:00 to 10:07. Each bar opens one point above the previous one.
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "market_data")
+TICKERS = ["AAPL", "MSFT"]
+
+
+def load(tickers=TICKERS, frames=FRAMES):
+    provider = FixtureProvider(FIXTURES)
+    return provider, fetch_frames(tickers, frames, provider=provider, resampler=Resampler())
+
+
+def bar(df, time):
+    return df.loc[pd.Timestamp(f"2024-06-14 {time}", tz="America/New_York")].to_dict()
+
+
+def test_one_grouped_download_per_interval_and_period():
+    provider, data = load()
+    groups = {(params["interval"], params["period"]) for params in FRAMES.values()}
+    assert sorted((interval, period) for _, interval, period, _ in provider.calls) == sorted(groups)
+    assert all(tickers == tuple(TICKERS) for tickers, _, _, _ in provider.calls)
+    assert set(data) == set(TICKERS)
+    assert all(set(frames) == set(FRAMES) for frames in data.values())
+
+
+def test_missing_ticker_gets_empty_frames():
+    _, data = load(["AAPL", "NOPE"])
+    assert all(df.empty for df in data["NOPE"].values())
+    assert not data["AAPL"]["5m"].empty
+
+
+def test_forming_5m_bar_is_spliced_from_1m():
+    assert finer_source("5m", ["1m", "5m", "1d"]) == "1m"
+    assert finer_source("1m", ["1m", "5m", "1d"]) is None
+    assert finer_source("1d", ["1m", "5m", "1d"]) is None
+    _, data = load()
+    five = data["AAPL"]["5m"]
+    # Bars before the 1m window come from the 5m download; from 10:00 on they are rebuilt from 1m
+    assert bar(five, "09:55") == {"Open": 105.0, "High": 106.0, "Low": 104.0, "Close": 105.5, "Volume": 1000.0}
+    assert bar(five, "10:00") == {"Open": 200.0, "High": 206.0, "Low": 198.0, "Close": 205.0, "Volume": 50.0}
+    assert bar(five, "10:05") == {"Open": 205.0, "High": 209.0, "Low": 203.0, "Close": 208.0, "Volume": 30.0}
+    assert five.index.is_monotonic_increasing and not five.index.has_duplicates
+
+
+def test_10m_is_rebuilt_from_5m():
+    provider, data = load()
+    ten = data["AAPL"]["10m"]
+    assert not any(interval == "10m" for _, interval, _, _ in provider.calls)
+    assert len(ten) == 4
+    assert bar(ten, "09:30") == {"Open": 100.0, "High": 102.0, "Low": 99.0, "Close": 101.5, "Volume": 2000.0}
+    # The last 10m bar is built from the spliced 5m bars, so it follows the latest 1m bar
+    assert bar(ten, "10:00") == {"Open": 200.0, "High": 209.0, "Low": 198.0, "Close": 208.0, "Volume": 80.0}
+
+
+def test_splice_keeps_coarse_bar_of_partly_covered_bucket():
+    index = pd.date_range("2024-06-14 09:30", periods=4, freq="5min")
+    coarse = pd.DataFrame({"Close": [1.0, 2.0, 3.0, 4.0]}, index=index)
+    rebuilt = pd.DataFrame({"Close": [20.0, 30.0, 40.0]}, index=index[1:])
+    # Fine bars start at 09:37, inside the 09:35 bucket, so that bucket's rebuilt bar is incomplete
+    spliced = splice(coarse, rebuilt, pd.Timestamp("2024-06-14 09:37"))
+    assert spliced["Close"].tolist() == [1.0, 2.0, 30.0, 40.0]
+
+
+def ohlcv(n=3, start=1.0):
+    index = pd.date_range("2024-06-14 09:30", periods=n, freq="5min")
+    values = start + np.arange(n, dtype="float64")
+    return pd.DataFrame({"Open": values, "High": values + 1, "Low": values - 1, "Close": values, "Volume": values * 10}, index=index)
+
+
+def test_split_by_ticker_single_ticker_frame():
+    # Older yfinance returns flat columns for one ticker, newer a (ticker, field) MultiIndex
+    for df in (ohlcv(), pd.concat({"AAPL": ohlcv()}, axis=1)):
+        out = split_by_ticker(df, ["AAPL"])
+        assert list(out) == ["AAPL"]
+        pd.testing.assert_frame_equal(out["AAPL"], ohlcv(), check_freq=False)
+    # A flat frame can't be attributed to one of several tickers
+    assert split_by_ticker(ohlcv(), ["AAPL", "MSFT"]) == {}
+
+
+def test_split_by_ticker_multi_ticker_frame():
+    aapl, msft = ohlcv(start=1.0), ohlcv(start=100.0)
+    msft.iloc[0] = np.nan
+    grouped = pd.concat({"AAPL": aapl, "MSFT": msft}, axis=1)
+    for df in (grouped, grouped.swaplevel(axis=1)):
+        out = split_by_ticker(df, ["AAPL", "MSFT", "NOPE"])
+        assert set(out) == {"AAPL", "MSFT"}
+        pd.testing.assert_frame_equal(out["AAPL"], aapl, check_freq=False)
+        # Rows where the ticker has no data at all are dropped
+        pd.testing.assert_frame_equal(out["MSFT"], msft.iloc[1:], check_freq=False)
+    assert split_by_ticker(pd.DataFrame(), ["AAPL"]) == {}
+
+
+def test_resampler_drops_least_recently_used_aggregates():
+    resampler = Resampler(max_entries=2)
+    base = ohlcv(10)
+    for key in ("A", "B"):
+        resampler.get(key, base, "10min")
+    # A is used again, so C pushes B out
+    resampler.get("A", base, "10min")
+    resampler.get("C", base, "10min")
+    assert list(resampler.cache) == ["A", "C"]
@@ -0,0 +1,68 @@
+import pytest
+import news
+from http_client import UpstreamError
+
+
+class Response:
+    def __init__(self, payload, status_code=200, stale=False):
+        self.payload = payload
+        self.status_code = status_code
+        self.content = b"{}"
+        if stale:
+            self.stale = True
+
+    def json(self):
+        return self.payload
+
+
+class Session:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def get(self, url, params=None, timeout=None):
+        response = self.responses[params["q"]]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def memo(tmp_path, monkeypatch):
+    memo = news.SentimentMemo(str(tmp_path / "sentiment.json"))
+    # Keeps TextBlob out of the test: every headline is already scored
+    memo.entries = {f"{s}-1": {"polarity": 0.5, "seen": 1e12} for s in ("AAPL", "MSFT", "TSLA", "NVDA")}
+    return memo
+
+
+def story(symbol):
+    return {"news": [{"uuid": f"{symbol}-1", "title": f"{symbol} beats", "link": ""}]}
+
+
+def test_upstream_failures_are_reported_not_shown_as_no_news(memo):
+    session = Session({
+        "AAPL": Response(story("AAPL")),
+        "MSFT": UpstreamError("breaker open for query1.finance.yahoo.com"),
+        "TSLA": Response({}, status_code=429),
+        "NVDA": Response(story("NVDA"), stale=True),
+    })
+    out = news.load_news(["AAPL", "MSFT", "TSLA", "NVDA"], session=session, max_workers=2, memo=memo)
+    assert out["AAPL"]["error"] is None and len(out["AAPL"]["items"]) == 1
+    assert out["MSFT"]["error"] and out["MSFT"]["items"] == []
+    assert out["TSLA"]["error"] and out["TSLA"]["items"] == []
+    assert out["NVDA"]["stale"] and out["NVDA"]["error"] is None and len(out["NVDA"]["items"]) == 1
+
+
+def test_unparseable_body_is_no_news(memo):
+    session = Session({"AAPL": Response(None)})
+    assert news.fetch_headlines("AAPL", session) == ([], False)
+
+
+def test_memo_is_only_dirty_after_new_scores_or_an_old_seen(memo, monkeypatch):
+    articles = {"AAPL-1": "AAPL beats"}
+    memo.entries["AAPL-1"]["seen"] = 1000.0
+    monkeypatch.setattr(news.time, "time", lambda: 1000.0 + news.SEEN_RESOLUTION - 1)
+    assert memo.score(articles) == {"AAPL-1": 0.5}
+    assert not memo.dirty
+    monkeypatch.setattr(news.time, "time", lambda: 1000.0 + news.SEEN_RESOLUTION)
+    memo.score(articles)
+    assert memo.dirty and memo.entries["AAPL-1"]["seen"] == 1000.0 + news.SEEN_RESOLUTION
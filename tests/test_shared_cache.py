@@ -0,0 +1,168 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import shared_cache
+from shared_cache import LEASE, TAIL, TTL, SharedCache, SharedCacheProvider, encode
+
+# Saturday: no bar closes before Monday, so only the TTL limits freshness
+WEEKEND = pd.Timestamp("2024-06-15 12:00", tz="America/New_York").timestamp()
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # Lets the other threads run while fake time moves on
+        time.sleep(0.01)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(WEEKEND)
+    monkeypatch.setattr(shared_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return SharedCache(str(tmp_path / "cache.sqlite"))
+
+
+def bars(n=12, start="2024-06-14 09:30", value=1.0):
+    index = pd.date_range(start, periods=n, freq="5min", tz="America/New_York")
+    return pd.DataFrame({"Close": value + np.arange(n, dtype="float64"), "Volume": 100.0}, index=index)
+
+
+class CountingProvider:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def download(self, tickers, interval, period=None, start=None):
+        with self.lock:
+            self.calls.append((tuple(tickers), interval, period, start))
+        time.sleep(self.delay)
+        df = bars()
+        if start is not None:
+            df = df[df.index >= start]
+        return {t: df for t in tickers}
+
+
+def test_round_trip_keeps_timezone(cache):
+    cache.write({"AAPL": bars()}, "5m", "5d")
+    out, missing = cache.read(["AAPL", "MSFT"], "5m", "5d")
+    assert missing == ["MSFT"]
+    pd.testing.assert_frame_equal(out["AAPL"], bars(), check_freq=False)
+    assert str(out["AAPL"].index.tz) == "America/New_York"
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.write({"AAPL": bars()}, "5m", "5d")
+    clock.now += TTL["5m"] - 1
+    assert cache.read(["AAPL"], "5m", "5d")[1] == []
+    clock.now += 2
+    assert cache.read(["AAPL"], "5m", "5d")[1] == ["AAPL"]
+
+
+def test_ttl_is_capped_at_the_next_bar_close(cache, clock):
+    clock.now = pd.Timestamp("2024-06-14 10:04:50", tz="America/New_York").timestamp()
+    cache.write({"AAPL": bars()}, "5m", "5d")
+    cache.write({"AAPL": bars()}, "1d", "1y")
+    clock.now += 9
+    assert cache.read(["AAPL"], "5m", "5d")[1] == []
+    # The 10:05 bar has closed: the entry fetched before it is stale even though the TTL hasn't run out
+    clock.now += 2
+    assert cache.read(["AAPL"], "5m", "5d")[1] == ["AAPL"]
+    # Daily bars only close at 16:00, so the full TTL applies
+    assert cache.read(["AAPL"], "1d", "1y")[1] == []
+
+
+def test_least_recently_read_entries_are_evicted(cache, clock):
+    size = len(encode(bars())[0])
+    cache.max_bytes = int(size * 2.5)
+    cache.write({"A": bars()}, "5m", "5d")
+    clock.now += 1
+    cache.write({"B": bars()}, "5m", "5d")
+    clock.now += 1
+    cache.read(["A"], "5m", "5d")
+    clock.now += 1
+    cache.write({"C": bars()}, "5m", "5d")
+    out, missing = cache.read(["A", "B", "C"], "5m", "5d")
+    assert set(out) == {"A", "C"} and missing == ["B"]
+
+
+def test_start_reads_are_served_by_entries_reaching_back_far_enough(cache):
+    cache.write({"AAPL": bars()}, "5m", "5d")
+    start = pd.Timestamp("2024-06-14 10:00", tz="America/New_York")
+    out, missing = cache.read(["AAPL"], "5m", start=start)
+    assert missing == []
+    assert out["AAPL"].index[0] == start and len(out["AAPL"]) == 6
+    # A naive start is read as UTC, the way the bar store passes it
+    out, _ = cache.read(["AAPL"], "5m", start=start.tz_convert("UTC").tz_localize(None))
+    assert out["AAPL"].index[0] == start
+    # Nothing cached goes back to 09:00, so that read is a miss
+    assert cache.read(["AAPL"], "5m", start=pd.Timestamp("2024-06-14 09:00", tz="America/New_York"))[1] == ["AAPL"]
+
+
+def test_provider_stores_incremental_downloads_as_tail(cache):
+    provider = CountingProvider()
+    cached = SharedCacheProvider(provider, cache)
+    start = pd.Timestamp("2024-06-14 10:00", tz="America/New_York")
+    first = cached.download(["AAPL"], "5m", start=start)
+    # A later start inside the tail is served from it without another download
+    later = cached.download(["AAPL"], "5m", start=start + pd.Timedelta(minutes=15))
+    assert len(provider.calls) == 1
+    assert later["AAPL"].index[0] == start + pd.Timedelta(minutes=15)
+    assert len(first["AAPL"]) == 6 and len(later["AAPL"]) == 3
+    db = cache._connect()
+    assert db.execute("SELECT period FROM bars").fetchall() == [(TAIL,)]
+
+
+def test_leases_are_exclusive_until_released_or_expired(cache, clock):
+    assert cache.acquire(["A", "B"], "5m", "5d") == ["A", "B"]
+    other = []
+    thread = threading.Thread(target=lambda: other.append(cache.acquire(["A", "B", "C"], "5m", "5d")))
+    thread.start()
+    thread.join()
+    assert other == [["C"]]
+    cache.release(["A"], "5m", "5d")
+    clock.now += 1
+    thread = threading.Thread(target=lambda: other.append(cache.acquire(["A", "B"], "5m", "5d")))
+    thread.start()
+    thread.join()
+    assert other[-1] == ["A"]
+    # B's holder never released it; once the lease runs out someone else may fetch it
+    clock.now += LEASE
+    thread = threading.Thread(target=lambda: other.append(cache.acquire(["B"], "5m", "5d")))
+    thread.start()
+    thread.join()
+    assert other[-1] == ["B"]
+
+
+def test_concurrent_downloads_of_one_key_fetch_once(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    provider = CountingProvider(delay=0.3)
+    results = []
+
+    def fetch():
+        # Separate cache objects on one file, like separate processes
+        results.append(SharedCacheProvider(provider, SharedCache(path)).download(["AAPL", "MSFT"], "5m", period="5d"))
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(provider.calls) == 1
+    assert len(results) == 4
+    for result in results:
+        assert set(result) == {"AAPL", "MSFT"}
+        pd.testing.assert_frame_equal(result["AAPL"], bars(), check_freq=False)
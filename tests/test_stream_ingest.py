@@ -0,0 +1,67 @@
+import pandas as pd
+from stream_ingest import ReplaySource, StreamIngestor
+
+# Ticks as recorded, in arrival order (UTC; 13:30 is the 09:30 open)
+TICKS = """timestamp,symbol,price,size
+2024-06-14 13:30:05,AAPL,100,10
+2024-06-14 13:30:20,AAPL,102,5
+2024-06-14 13:30:30,MSFT,50,1
+2024-06-14 13:30:15,AAPL,99,2
+2024-06-14 13:30:01,AAPL,98.5,1
+2024-06-14 13:31:10,AAPL,103,4
+2024-06-14 13:30:50,AAPL,200,7
+2024-06-14 13:31:40,AAPL,101,1
+2024-06-14 13:35:00,AAPL,104,1
+"""
+
+
+def ts(time):
+    return pd.Timestamp(f"2024-06-14 {time}", tz="UTC").value
+
+
+def replay(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(TICKS)
+    bars = []
+    ingestor = StreamIngestor(lambda symbol, tf, ts, bar: bars.append((symbol, tf, ts, tuple(bar))))
+    ingestor.run(ReplaySource(str(path)))
+    return ingestor, bars
+
+
+def emitted(bars, symbol, tf):
+    return [(ts, bar) for s, t, ts, bar in bars if s == symbol and t == tf]
+
+
+def test_replay_aggregates_1m_bars(tmp_path):
+    ingestor, bars = replay(tmp_path)
+    assert emitted(bars, "AAPL", "1m") == [
+        # Out-of-order ticks inside the bar: 13:30:01 becomes the open, 13:30:15 doesn't move the close
+        (ts("13:30"), (98.5, 102.0, 98.5, 102.0, 18.0)),
+        # The 13:30:50 tick arrives after this bar opened; its own bar had closed, so it is dropped
+        (ts("13:31"), (103.0, 103.0, 101.0, 101.0, 5.0)),
+        # The forming bar is emitted when the replay ends
+        (ts("13:35"), (104.0, 104.0, 104.0, 104.0, 1.0)),
+    ]
+    assert emitted(bars, "MSFT", "1m") == [(ts("13:30"), (50.0, 50.0, 50.0, 50.0, 1.0))]
+    frame = ingestor.frame("AAPL", "1m")
+    assert frame.index[0] == pd.Timestamp("2024-06-14 09:30", tz="America/New_York")
+    assert frame["Close"].tolist() == [102.0, 101.0, 104.0]
+
+
+def test_forming_bar_is_revised_until_it_closes(tmp_path):
+    _, bars = replay(tmp_path)
+    # The 13:30:50 tick is late for 1m but still inside the forming 5m bar, so it revises that bar's high
+    # and volume without replacing the close set by the later 13:31:40 tick
+    assert emitted(bars, "AAPL", "5m") == [
+        (ts("13:30"), (98.5, 200.0, 98.5, 101.0, 30.0)),
+        (ts("13:35"), (104.0, 104.0, 104.0, 104.0, 1.0)),
+    ]
+    assert emitted(bars, "AAPL", "10m") == [(ts("13:30"), (98.5, 200.0, 98.5, 104.0, 31.0))]
+
+
+def test_bars_are_emitted_in_time_order_per_symbol(tmp_path):
+    _, bars = replay(tmp_path)
+    for symbol in ("AAPL", "MSFT"):
+        for tf in ("1m", "5m", "10m"):
+            times = [ts for ts, _ in emitted(bars, symbol, tf)]
+            assert times == sorted(set(times))
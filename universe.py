@@ -0,0 +1,13 @@
+import pandas as pd
+
+
+def read_universe(path):
+    # Symbols from a text file (one per line, # comments allowed) or a CSV with a symbol/ticker column
+    if path.endswith(".csv"):
+        df = pd.read_csv(path)
+        column = next((c for c in df.columns if c.lower() in ("symbol", "ticker")), df.columns[0])
+        symbols = df[column].astype(str).tolist()
+    else:
+        with open(path) as f:
+            symbols = [line.split("#")[0].strip() for line in f]
+    return list(dict.fromkeys(s.upper() for s in symbols if s))
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import metrics
+from bar_store import get_store
+from indicators import build_panel
+from universe import read_universe
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".trading_assistant", "volume_index")
+WINDOWS = [10, 20, 50]
+SESSION_MINUTES = 390
+MARKET_TZ = "America/New_York"
+CHUNK = 200
+
+
+def session_minute(index):
+    # Minutes since the 9:30 open, in exchange time
+    ny = index.tz_convert(MARKET_TZ) if index.tz is not None else index.tz_localize("UTC").tz_convert(MARKET_TZ)
+    return np.asarray(ny.hour * 60 + ny.minute - 570), ny.normalize()
+
+
+def average_volumes(daily_volume, windows=WINDOWS):
+    # daily_volume: sessions x symbols panel; means of each symbol's last N sessions that traded
+    out = np.full((daily_volume.shape[1], len(windows)), np.nan)
+    values = daily_volume.to_numpy(dtype="float64")
+    for col in range(values.shape[1]):
+        traded = values[:, col][~np.isnan(values[:, col])]
+        for j, window in enumerate(windows):
+            if len(traded):
+                out[col, j] = traded[-window:].mean()
+    return out
+
+
+def volume_profile(df):
+    # Average cumulative volume at each minute of the session, over complete sessions only
+    if df is None or df.empty:
+        return np.full(SESSION_MINUTES, np.nan, dtype="float32")
+    minute, day = session_minute(df.index)
+    regular = (minute >= 0) & (minute < SESSION_MINUTES)
+    minute, day = minute[regular], day[regular]
+    volume = np.nan_to_num(df["Volume"].to_numpy(dtype="float64")[regular])
+    days, day_code = np.unique(day, return_inverse=True)
+    grid = np.zeros((len(days), SESSION_MINUTES))
+    np.add.at(grid, (day_code, minute), volume)
+    last_minute = np.zeros(len(days), dtype=int)
+    np.maximum.at(last_minute, day_code, minute)
+    complete = last_minute >= SESSION_MINUTES - 10
+    if not complete.any():
+        return np.full(SESSION_MINUTES, np.nan, dtype="float32")
+    return grid[complete].cumsum(axis=1).mean(axis=0).astype("float32")
+
+
+class VolumeIndex:
+    # Memory-mapped average daily volume (10/20/50d) and per-minute cumulative volume profile per symbol.
+    # Each build goes to its own directory and CURRENT is switched atomically, so readers never see a mix.
+    def __init__(self, root=None):
+        self.root = root or os.environ.get("VOLUME_INDEX_DIR", DEFAULT_ROOT)
+        self.version = None
+        self.symbols = np.array([], dtype="<U16")
+        self.averages = np.empty((0, len(WINDOWS)))
+        self.profiles = np.empty((0, SESSION_MINUTES), dtype="float32")
+        self.windows = WINDOWS
+        self.load()
+
+    def _current(self):
+        try:
+            with open(os.path.join(self.root, "CURRENT")) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def load(self):
+        version = self._current()
+        if version is None or version == self.version:
+            return
+        path = os.path.join(self.root, version)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.windows = meta["windows"]
+        self.symbols = np.load(os.path.join(path, "symbols.npy"), mmap_mode="r")
+        self.averages = np.load(os.path.join(path, "averages.npy"), mmap_mode="r")
+        self.profiles = np.load(os.path.join(path, "profiles.npy"), mmap_mode="r")
+        self.version = version
+
+    def refresh(self):
+        # Picks up a newer nightly build without restarting the process
+        self.load()
+
+    def positions(self, symbols):
+        # Row of each symbol in the index, -1 where it's missing
+        symbols = np.asarray(symbols, dtype=str)
+        if len(self.symbols) == 0:
+            return np.full(len(symbols), -1)
+        pos = np.searchsorted(self.symbols, symbols)
+        pos = np.minimum(pos, len(self.symbols) - 1)
+        return np.where(self.symbols[pos] == symbols, pos, -1)
+
+    def average(self, symbols, window=10):
+        pos = self.positions(symbols)
+        if len(self.symbols) == 0:
+            return np.full(len(pos), np.nan)
+        values = np.asarray(self.averages[np.maximum(pos, 0), self.windows.index(window)], dtype="float64")
+        return np.where(pos >= 0, values, np.nan)
+
+    def rvol(self, symbols, volumes, window=10):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg = self.average(symbols, window)
+            return np.where(avg > 0, np.asarray(volumes, dtype="float64") / avg, np.nan)
+
+    def time_of_day_rvol(self, symbols, volumes, now=None):
+        # Today's cumulative volume against the average cumulative volume by this minute of the session
+        now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now).tz_convert(MARKET_TZ)
+        minute = now.hour * 60 + now.minute - 570
+        pos = self.positions(symbols)
+        # Pre-market, after-hours and weekend volume has no regular-session profile to compare against
+        if len(self.symbols) == 0 or now.weekday() >= 5 or not 0 <= minute < SESSION_MINUTES:
+            return np.full(len(pos), np.nan)
+        expected = np.asarray(self.profiles[np.maximum(pos, 0), minute], dtype="float64")
+        expected = np.where(pos >= 0, expected, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(expected > 0, np.asarray(volumes, dtype="float64") / expected, np.nan)
+
+    def build(self, symbols, store=None, provider=None, refresh=True, profile_days=20):
+        store = store or get_store()
+        symbols = sorted(dict.fromkeys(s.upper() for s in symbols))
+        averages = np.full((len(symbols), len(WINDOWS)), np.nan)
+        profiles = np.full((len(symbols), SESSION_MINUTES), np.nan, dtype="float32")
+        for start in range(0, len(symbols), CHUNK):
+            chunk = symbols[start:start + CHUNK]
+            with metrics.stage("volume_index_daily"):
+                daily = store.load(chunk, "1d", "3mo", provider, refresh=refresh)
+                panel = build_panel(daily, "Volume").reindex(columns=chunk)
+                averages[start:start + len(chunk)] = average_volumes(panel)
+            with metrics.stage("volume_index_profile"):
+                if refresh:
+                    # Yahoo serves about a week of 1m bars; the store accumulates older sessions
+                    store.update(chunk, "1m", "5d", provider)
+                minute_bars = store.load(chunk, "1m", f"{profile_days}d", refresh=False)
+                for i, symbol in enumerate(chunk):
+                    profiles[start + i] = volume_profile(minute_bars.get(symbol))
+        self.write(symbols, averages, profiles)
+        return len(symbols)
+
+    def write(self, symbols, averages, profiles):
+        version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.root, version)
+        os.makedirs(path, exist_ok=True)
+        width = max([len(s) for s in symbols] + [1])
+        np.save(os.path.join(path, "symbols.npy"), np.array(symbols, dtype=f"<U{width}"))
+        np.save(os.path.join(path, "averages.npy"), averages)
+        np.save(os.path.join(path, "profiles.npy"), profiles)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"windows": WINDOWS, "symbols": len(symbols), "built": time.time()}, f)
+        previous = self._current()
+        tmp = os.path.join(self.root, f".CURRENT.{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.root, "CURRENT"))
+        # Keep the previous build for readers that still have it mapped
+        for name in os.listdir(self.root):
+            if name not in (version, previous, "CURRENT") and not name.startswith("."):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        self.load()
+
+
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = VolumeIndex()
+    else:
+        _index.refresh()
+    return _index
+
+
+def set_index(index):
+    global _index
+    _index = index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the nightly average-volume index and per-minute volume profiles")
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--universe", help="text file with one symbol per line, or a CSV with a symbol column")
+    parser.add_argument("--profile-days", type=int, default=20, help="sessions of 1m bars averaged into the profile")
+    args = parser.parse_args()
+
+    symbols = [s.upper() for s in args.symbols] + (read_universe(args.universe) if args.universe else [])
+    if not symbols:
+        parser.error("give symbols or --universe")
+    started = time.perf_counter()
+    index = VolumeIndex()
+    count = index.build(symbols, profile_days=args.profile_days)
+    covered = int(np.isfinite(np.asarray(index.averages[:, 0])).sum())
+    print(f"📦 Indexed {count} symbols ({covered} with volume history) in {time.perf_counter() - started:.1f}s → {index.root}")
+
+
+if __name__ == "__main__":
+    main()